@@ -0,0 +1,299 @@
+"""Local stand-in for the Jira Cloud endpoints the dashboard uses.
+
+Serves a deterministic synthetic organisation over HTTP:
+
+- POST /rest/api/3/search/jql (assignee, `assignee was in`, duedate, relative
+  `updated >=` and statusCategory filters; maxResults/nextPageToken pagination)
+- POST /rest/api/3/search/approximate-count (same filters)
+- GET  /rest/api/3/group/member (startAt/maxResults pagination)
+- GET  /rest/api/3/project/search (startAt/maxResults pagination)
+
+Plus two control routes for the harness: GET /__stats returns request and
+byte counters, POST /__reset clears them.
+
+Run standalone with `python -m benchmarks.fake_jira --users 200 --groups 5`.
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Event, Process
+from urllib.parse import parse_qs, urlparse
+
+_ASSIGNEE_IN = re.compile(r'assignee\s+in\s*\(([^)]*)\)', re.IGNORECASE)
+_ASSIGNEE_WAS_IN = re.compile(r'assignee\s+was\s+in\s*\(([^)]*)\)', re.IGNORECASE)
+_ASSIGNEE_EQ = re.compile(r'assignee\s*=\s*"?([^"\s)]+)"?', re.IGNORECASE)
+_DUE_FROM = re.compile(r'duedate\s*>=\s*"([^"]+)"', re.IGNORECASE)
+_DUE_TO = re.compile(r'duedate\s*<=\s*"([^"]+)"', re.IGNORECASE)
+_PROJECT = re.compile(r'project\s*=\s*"?([A-Z0-9]+)"?')
+_UPDATED_SINCE = re.compile(r'updated\s*>=\s*"-(\d+)m"', re.IGNORECASE)
+_NOT_DONE = re.compile(r'statusCategory\s*!=\s*Done', re.IGNORECASE)
+_UPDATED_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+
+def _accounts(match):
+    return [a.strip().strip('"') for a in match.group(1).split(",") if a.strip()]
+
+
+class SyntheticOrg:
+    """Users, groups and open issues generated from a fixed seed."""
+
+    def __init__(self, users=200, groups=5, issues_per_user=50, projects=20, overlap=0.3, seed=7):
+        rng = random.Random(seed)
+        today = dt.date.today()
+        self.users = [
+            {
+                "accountId": f"712020:{i:08x}-0000-4000-8000-bench",
+                "displayName": f"bench user {i}",
+                "emailAddress": f"user{i}@example.com",
+                "accountType": "atlassian",
+                "active": True,
+            }
+            for i in range(users)
+        ]
+        self.groups = {f"bench-group-{g}": [] for g in range(groups)}
+        names = list(self.groups)
+        for i, user in enumerate(self.users):
+            self.groups[names[i % groups]].append(user)
+            if groups > 1 and rng.random() < overlap:
+                other = names[(i + 1 + rng.randrange(groups - 1)) % groups]
+                self.groups[other].append(user)
+
+        self.projects = [{"key": f"BP{p}", "name": f"Bench Project {p}"} for p in range(projects)]
+        self.issues_by_assignee = {}
+        n = 0
+        for user in self.users:
+            issues = []
+            for _ in range(issues_per_user):
+                n += 1
+                project = rng.choice(self.projects)
+                due = None if rng.random() < 0.2 else (today + dt.timedelta(days=rng.randint(-90, 270))).isoformat()
+                issues.append({
+                    "id": str(n),
+                    "key": f"{project['key']}-{n}",
+                    "fields": {
+                        "project": dict(project),
+                        "timeoriginalestimate": rng.choice([None, 1800, 3600, 7200, 14400, 28800]),
+                        "status": {"name": "To Do", "statusCategory": {"key": "new"}},
+                        "assignee": {"accountId": user["accountId"]},
+                        "duedate": due,
+                        "updated": "2025-01-01T00:00:00.000+0000",
+                    },
+                })
+            self.issues_by_assignee[user["accountId"]] = issues
+        # Issue key -> account IDs it was assigned to before, for `assignee was in`
+        self.former_assignees = {}
+        self._next_id = n
+
+    def _find(self, key):
+        for issues in self.issues_by_assignee.values():
+            for issue in issues:
+                if issue["key"] == key:
+                    return issue
+        raise KeyError(key)
+
+    def add_issue(self, account_id, project_key, estimate=None, duedate=None):
+        """Create an open issue for account_id, updated now; returns its key."""
+        self._next_id += 1
+        project = next(p for p in self.projects if p["key"] == project_key)
+        issue = {
+            "id": str(self._next_id),
+            "key": f"{project_key}-{self._next_id}",
+            "fields": {
+                "project": dict(project),
+                "timeoriginalestimate": estimate,
+                "status": {"name": "To Do", "statusCategory": {"key": "new"}},
+                "assignee": {"accountId": account_id},
+                "duedate": duedate,
+                "updated": None,
+            },
+        }
+        self.issues_by_assignee.setdefault(account_id, []).append(issue)
+        self.update_issue(issue["key"])
+        return issue["key"]
+
+    def update_issue(self, key, assignee=None, done=False, touch=True, **fields):
+        """Edit an issue in place: reassign it, close it or set raw fields.
+
+        touch=False leaves `updated` alone, like an edit a delta sync should miss.
+        """
+        issue = self._find(key)
+        f = issue["fields"]
+        if assignee is not None and assignee != f["assignee"]["accountId"]:
+            old = f["assignee"]["accountId"]
+            self.former_assignees.setdefault(key, set()).add(old)
+            self.issues_by_assignee[old].remove(issue)
+            self.issues_by_assignee.setdefault(assignee, []).append(issue)
+            f["assignee"] = {"accountId": assignee}
+        if done:
+            f["status"] = {"name": "Done", "statusCategory": {"key": "done"}}
+        f.update(fields)
+        if touch:
+            f["updated"] = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+    def search(self, jql):
+        """Return the issues matching the subset of JQL the dashboard emits."""
+        match = _ASSIGNEE_IN.search(jql)
+        if match:
+            accounts = _accounts(match)
+        else:
+            match = _ASSIGNEE_EQ.search(jql)
+            accounts = [match.group(1)] if match else list(self.issues_by_assignee)
+        issues = [i for acc in accounts for i in self.issues_by_assignee.get(acc, [])]
+        was_in = _ASSIGNEE_WAS_IN.search(jql)
+        if was_in:
+            former = set(_accounts(was_in))
+            seen = {i["key"] for i in issues}
+            issues += [
+                i for acc_issues in self.issues_by_assignee.values() for i in acc_issues
+                if i["key"] not in seen and self.former_assignees.get(i["key"], set()) & former
+            ]
+        if _NOT_DONE.search(jql):
+            issues = [i for i in issues if i["fields"]["status"]["statusCategory"]["key"] != "done"]
+        updated = _UPDATED_SINCE.search(jql)
+        if updated:
+            since = dt.datetime.now(dt.timezone.utc) - dt.timedelta(minutes=int(updated.group(1)))
+            issues = [i for i in issues if dt.datetime.strptime(i["fields"]["updated"], _UPDATED_FORMAT) >= since]
+        due_from, due_to = _DUE_FROM.search(jql), _DUE_TO.search(jql)
+        project = _PROJECT.search(jql)
+        if due_from:
+            issues = [i for i in issues if i["fields"]["duedate"] and i["fields"]["duedate"] >= due_from.group(1)]
+        if due_to:
+            issues = [i for i in issues if i["fields"]["duedate"] and i["fields"]["duedate"] <= due_to.group(1)]
+        if project:
+            issues = [i for i in issues if i["fields"]["project"]["key"] == project.group(1)]
+        return issues
+
+
+def make_handler(org, latency=0.0, max_page_size=100, throttle_every=0):
+    """Build a request handler class bound to an org and server behaviour."""
+    stats = {"requests": {}, "bytes_out": 0, "throttled": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, obj, status=200, headers=None):
+            body = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            with lock:
+                stats["bytes_out"] += len(body)
+
+        def _count(self, path):
+            with lock:
+                stats["requests"][path] = stats["requests"].get(path, 0) + 1
+                total = sum(stats["requests"].values())
+            if latency:
+                time.sleep(latency)
+            return total
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/__stats":
+                with lock:
+                    snapshot = json.loads(json.dumps(stats))
+                return self._send(snapshot)
+            self._count(url.path)
+            if url.path == "/rest/api/3/group/member":
+                members = org.groups.get(query.get("groupname", [""])[0])
+                if members is None:
+                    return self._send({"errorMessages": ["Group not found"]}, 404)
+                start = int(query.get("startAt", ["0"])[0])
+                size = min(int(query.get("maxResults", ["50"])[0]), 50)
+                return self._send({
+                    "values": members[start:start + size],
+                    "total": len(members),
+                    "isLast": start + size >= len(members),
+                })
+            if url.path == "/rest/api/3/project/search":
+                start = int(query.get("startAt", ["0"])[0])
+                size = min(int(query.get("maxResults", ["50"])[0]), 50)
+                return self._send({
+                    "values": org.projects[start:start + size],
+                    "total": len(org.projects),
+                    "isLast": start + size >= len(org.projects),
+                })
+            self._send({"errorMessages": ["Not found"]}, 404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if url.path == "/__reset":
+                with lock:
+                    stats.update({"requests": {}, "bytes_out": 0, "throttled": 0})
+                return self._send({})
+            total = self._count(url.path)
+            if throttle_every and total % throttle_every == 0:
+                with lock:
+                    stats["throttled"] += 1
+                return self._send({"errorMessages": ["Rate limited"]}, 429, {"Retry-After": "0.05"})
+            if url.path == "/rest/api/3/search/jql":
+                issues = org.search(body.get("jql", ""))
+                start = int(body.get("nextPageToken") or 0)
+                size = min(int(body.get("maxResults", 50)), max_page_size)
+                out = {"issues": issues[start:start + size], "isLast": start + size >= len(issues)}
+                if not out["isLast"]:
+                    out["nextPageToken"] = str(start + size)
+                return self._send(out)
+            if url.path == "/rest/api/3/search/approximate-count":
+                return self._send({"count": len(org.search(body.get("jql", "")))})
+            self._send({"errorMessages": ["Not found"]}, 404)
+
+    return Handler
+
+
+def serve(port, ready=None, **options):
+    """Run a fake Jira server in the foreground."""
+    org_options = {k: options.pop(k) for k in ("users", "groups", "issues_per_user", "projects", "overlap") if k in options}
+    org = SyntheticOrg(**org_options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(org, **options))
+    if ready is not None:
+        ready.set()
+    server.serve_forever()
+
+
+def start_in_subprocess(port, **options):
+    """Start the fake server in a child process and wait until it accepts requests."""
+    ready = Event()
+    proc = Process(target=serve, args=(port, ready), kwargs=options, daemon=True)
+    proc.start()
+    if not ready.wait(120):
+        proc.terminate()
+        raise RuntimeError("fake Jira server did not start")
+    return proc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=5)
+    parser.add_argument("--issues-per-user", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    print(f"Fake Jira on http://127.0.0.1:{args.port}")
+    serve(
+        args.port, users=args.users, groups=args.groups, issues_per_user=args.issues_per_user,
+        projects=args.projects, latency=args.latency_ms / 1000, max_page_size=args.page_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
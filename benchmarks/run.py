@@ -0,0 +1,174 @@
+"""Offline benchmark for the Jira workload dashboard.
+
+Starts benchmarks.fake_jira in a child process, points the app at it and
+times the jira_api functions and Dash callbacks directly. Reports latency
+percentiles, Jira requests and bytes per operation, and peak Python memory.
+
+    python -m benchmarks.run --users 500 --groups 8 --issues-per-user 40 --latency-ms 30
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+import tracemalloc
+import urllib.request
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Stats:
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def _call(self, method, path):
+        req = urllib.request.Request(self.base_url + path, method=method, data=b"{}" if method == "POST" else None)
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read())
+
+    def reset(self):
+        self._call("POST", "/__reset")
+
+    def snapshot(self):
+        data = self._call("GET", "/__stats")
+        return sum(data["requests"].values()), data["bytes_out"], data["throttled"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def measure(name, fn, stats, repeat, before=None):
+    """Run fn `repeat` times, calling before() (untimed) ahead of each run."""
+    timings, requests, sent, throttled = [], 0, 0, 0
+    tracemalloc.reset_peak()
+    base_mem = tracemalloc.get_traced_memory()[0]
+    for _ in range(repeat):
+        if before:
+            before()
+        stats.reset()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        r, b, t = stats.snapshot()
+        requests, sent, throttled = requests + r, sent + b, throttled + t
+    peak = tracemalloc.get_traced_memory()[1] - base_mem
+    return {
+        "name": name,
+        "runs": repeat,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "requests_per_run": requests / repeat,
+        "kb_per_run": sent / repeat / 1024,
+        "throttled": throttled,
+        "peak_mem_mb": peak / 2**20,
+    }
+
+
+def print_table(results):
+    header = f"{'operation':<38}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/run':>9}{'KB/run':>10}{'429s':>6}{'peak MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['name']:<38}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+              f"{r['requests_per_run']:>9.1f}{r['kb_per_run']:>10.1f}{r['throttled']:>6}{r['peak_mem_mb']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard against a fake Jira server.")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=5)
+    parser.add_argument("--issues-per-user", type=int, default=50)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--overlap", type=float, default=0.3, help="share of users in a second group")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--page-size", type=int, default=100, help="server-side cap on maxResults")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    from benchmarks.fake_jira import start_in_subprocess
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_in_subprocess(
+        port, users=args.users, groups=args.groups, issues_per_user=args.issues_per_user,
+        projects=args.projects, overlap=args.overlap, latency=args.latency_ms / 1000,
+        max_page_size=args.page_size, throttle_every=args.throttle_every,
+    )
+    group_names = [f"bench-group-{g}" for g in range(args.groups)]
+    # The app reads its configuration from the environment at import time
+    os.environ.update({
+        "JIRA_URL": base_url,
+        "JIRA_USER_EMAIL": "bench@example.com",
+        "JIRA_API_TOKEN": "bench",
+        "JIRA_GROUP_NAMES": ",".join(group_names),
+        "APPLY_DOMAIN_FILTER": "false",
+    })
+    for name in ("JIRA_ISSUE_STORE", "JIRA_SHARED_CACHE", "DASH_BACKGROUND_CACHE_DIR"):
+        os.environ.pop(name, None)
+
+    tracemalloc.start()
+    from jira_workload.api import jira_api
+    from jira_workload.app import dashboard
+
+    stats = Stats(base_url)
+    session = jira_api.connect_to_jira()
+    dashboard.start_services()
+    dashboard.membership.wait_ready()
+    users = dashboard.membership.all_users()
+    group = group_names[0]
+    group_ids = [u["accountId"] for u in dashboard.membership.group_members(group)]
+    account_id = group_ids[0]
+
+    def cold():
+        dashboard.planner.invalidate()
+        dashboard.invalidate_workload_cache()
+
+    def all_groups():
+        for name in group_names:
+            dashboard.update_group_payload(name, None, None)
+
+    results = [
+        measure("api: get_users_from_groups", lambda: jira_api.get_users_from_groups(session, group_names), stats, args.repeat),
+        measure("api: batched group issues (cold)", lambda: jira_api.get_issues_for_assignees(session, group_ids), stats, args.repeat, cold),
+        measure("api: count_issues", lambda: jira_api.count_issues(session, "statusCategory != Done"), stats, args.repeat),
+        measure("update_table (cold)", lambda: dashboard.update_table(account_id, None, None), stats, args.repeat, cold),
+        measure("update_table (warm)", lambda: dashboard.update_table(account_id, None, None), stats, args.repeat),
+        measure("update_group_payload (cold)", lambda: dashboard.update_group_payload(group, None, None), stats, args.repeat, cold),
+        measure("update_group_payload (warm)", lambda: dashboard.update_group_payload(group, None, None), stats, args.repeat),
+        # Overlapping members are fetched once across groups
+        measure("update_group_payload every group (cold)", all_groups, stats, args.repeat, cold),
+    ]
+    # Grouping-mode switches re-pivot this payload in the browser, without a server call
+    window = (time.strftime("%Y-%m-%d"), time.strftime("%Y-%m-%d", time.localtime(time.time() + 60 * 86400)))
+    results.append(measure(
+        "update_group_payload date window (warm)",
+        lambda: dashboard.update_group_payload(group, *window), stats, args.repeat,
+    ))
+
+    print(f"org: {len(users)} users, {args.groups} groups ({len(group_ids)} in {group}), "
+          f"{args.issues_per_user} issues/user, {args.latency_ms:g} ms latency, page size {args.page_size}")
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"config": vars(args), "results": results}, fh, indent=2)
+    server.terminate()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
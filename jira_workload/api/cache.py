@@ -0,0 +1,384 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv, find_dotenv
+from jira_workload.metrics import CACHE_LOOKUPS
+load_dotenv(find_dotenv())
+
+# ==== Env Variables ====
+# SQLite file shared by every worker process; unset keeps caches in-process
+SHARED_CACHE_PATH = os.getenv("JIRA_SHARED_CACHE", "")
+# How long another process may hold a load lease before we load the key ourselves
+SHARED_LEASE_SECONDS = float(os.getenv("JIRA_SHARED_CACHE_LEASE_SECONDS", "120"))
+
+
+class _Flight:
+    """An in-progress load that concurrent callers for the same key wait on."""
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+# ==== BACKENDS ====
+# A backend stores (value, expiry) per key. get() returns (found, value);
+# expired entries count as missing. update() applies a function to an
+# entry atomically, leaving its expiry and LRU position alone.
+
+class MemoryBackend:
+    """Per-process LRU dict."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[1]
+
+    def update(self, key, fn):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return False
+            value = fn(entry[1])
+            if value is not entry[1]:
+                self._entries[key] = (entry[0], value)
+            return True
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def try_lease(self, key, seconds):
+        # Threads in one process are already coalesced by TTLCache
+        return True
+
+    def release_lease(self, key):
+        pass
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT,
+    key TEXT,
+    value BLOB,
+    expires REAL,
+    accessed REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (namespace, accessed);
+CREATE TABLE IF NOT EXISTS cache_leases (
+    namespace TEXT,
+    key TEXT,
+    expires REAL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+class SQLiteBackend:
+    """Pickled entries in a SQLite file, shared by every process that opens it.
+
+    Keys must be JSON-serialisable (tuples come back as tuples). Expiry uses
+    wall-clock time so all processes agree on it. Load leases let one process
+    fetch a missing key while the others wait for its result.
+    """
+
+    def __init__(self, path, namespace, maxsize):
+        self.path = path
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SHARED_SCHEMA)
+
+    def _conn(self):
+        # One connection per thread and process; forked children open their own
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _encode(key):
+        return json.dumps(key, separators=(",", ":"))
+
+    @staticmethod
+    def _decode(text):
+        def tuples(v):
+            return tuple(tuples(x) for x in v) if isinstance(v, list) else v
+        return tuples(json.loads(text))
+
+    def get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, self._encode(key)),
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return False, None
+        conn.execute(
+            "UPDATE cache_entries SET accessed = ? WHERE namespace = ? AND key = ?",
+            (now, self.namespace, self._encode(key)),
+        )
+        return True, pickle.loads(row[0])
+
+    def update(self, key, fn):
+        encoded = self._encode(key)
+        conn = self._conn()
+        with conn:
+            # One write transaction, so concurrent updates from any process are applied in turn
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires > ?",
+                (self.namespace, encoded, time.time()),
+            ).fetchone()
+            if row is None:
+                return False
+            old = pickle.loads(row[0])
+            value = fn(old)
+            if value is not old:
+                conn.execute(
+                    "UPDATE cache_entries SET value = ? WHERE namespace = ? AND key = ?",
+                    (pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.namespace, encoded),
+                )
+            return True
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, self._encode(key), blob, now + ttl, now),
+            )
+            # Drop expired entries, then the least recently used beyond maxsize
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND expires <= ?", (self.namespace, now))
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.maxsize),
+            )
+
+    def delete(self, key):
+        encoded = self._encode(key)
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, encoded))
+            conn.execute("DELETE FROM cache_leases WHERE namespace = ? AND key = ?", (self.namespace, encoded))
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            conn.execute("DELETE FROM cache_leases WHERE namespace = ?", (self.namespace,))
+
+    def keys(self):
+        rows = self._conn().execute(
+            "SELECT key FROM cache_entries WHERE namespace = ? AND expires > ?", (self.namespace, time.time()),
+        )
+        return [self._decode(row[0]) for row in rows]
+
+    def try_lease(self, key, seconds):
+        """Claim the right to load key; False while another process holds an unexpired lease."""
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT expires FROM cache_leases WHERE namespace = ? AND key = ?",
+                (self.namespace, self._encode(key)),
+            ).fetchone()
+            if row is not None and row[0] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_leases VALUES (?, ?, ?)",
+                (self.namespace, self._encode(key), now + seconds),
+            )
+            return True
+
+    def release_lease(self, key):
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_leases WHERE namespace = ? AND key = ?", (self.namespace, self._encode(key)))
+
+    def __len__(self):
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ? AND expires > ?", (self.namespace, time.time()),
+        ).fetchone()
+        return row[0]
+
+
+def make_backend(name, maxsize, shared=False):
+    """SQLite backend at JIRA_SHARED_CACHE for shared caches when configured, else in-memory."""
+    if shared and SHARED_CACHE_PATH:
+        return SQLiteBackend(SHARED_CACHE_PATH, name, maxsize)
+    return MemoryBackend(maxsize)
+
+
+class TTLCache:
+    """Thread-safe cache with per-entry TTL, LRU eviction and single-flight loads.
+
+    Concurrent `get_or_load` calls for the same missing key share one loader
+    call; the others block until it finishes and receive the same value (or
+    exception). With `shared=True` and JIRA_SHARED_CACHE set, entries live in
+    SQLite and loads are also coalesced across processes.
+    """
+
+    def __init__(self, maxsize=256, ttl=300.0, name="default", shared=False, backend=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend if backend is not None else make_backend(name, maxsize, shared)
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return a fresh cached value without loading, or default."""
+        found, value = self.backend.get(key)
+        return value if found else default
+
+    def set(self, key, value, ttl=None):
+        """Store value for ttl seconds (default: the cache's TTL)."""
+        self.backend.set(key, value, self.ttl if ttl is None else ttl)
+
+    def update(self, key, fn):
+        """Replace an unexpired entry's value with fn(value) atomically, keeping its expiry.
+
+        fn may return its argument to leave the entry as is. Returns False
+        (without calling fn) if there is no such entry.
+        """
+        return self.backend.update(key, fn)
+
+    def get_or_load(self, key, loader, ttl=None):
+        """Return the cached value for key, calling loader() at most once on a miss.
+
+        ttl overrides the cache's TTL for a loaded value; it may be a callable,
+        asked after loader() returns.
+        """
+        found, value = self.backend.get(key)
+        if found:
+            CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+            return value
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                # Re-check: a previous leader may have stored it since our lookup
+                found, value = self.backend.get(key)
+                if found:
+                    CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+                    return value
+                flight = self._flights[key] = _Flight()
+
+        CACHE_LOOKUPS.inc(cache=self.name, result="miss" if leader else "coalesced")
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._load_once(key, loader, flight, ttl)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.event.set()
+
+    def _load_once(self, key, loader, flight, ttl=None):
+        # Wait for another process's load of the same key rather than repeating it
+        while not self.backend.try_lease(key, SHARED_LEASE_SECONDS):
+            time.sleep(0.1)
+            found, value = self.backend.get(key)
+            if found:
+                return value
+        try:
+            # The previous holder may have stored the value just before releasing
+            found, value = self.backend.get(key)
+            if found:
+                return value
+            value = loader()
+            if callable(ttl):
+                ttl = ttl()
+            with self._lock:
+                # Skip storing if the key was invalidated while loading
+                if self._flights.get(key) is flight:
+                    self.backend.set(key, value, self.ttl if ttl is None else ttl)
+            return value
+        finally:
+            self.backend.release_lease(key)
+
+    def refresh(self, key, loader):
+        """Drop any cached value for key and load it again."""
+        self.invalidate(key)
+        return self.get_or_load(key, loader)
+
+    def invalidate(self, key=None):
+        """Drop one key, or every entry when key is None."""
+        with self._lock:
+            if key is None:
+                self.backend.clear()
+                self._flights.clear()
+            else:
+                self.backend.delete(key)
+                self._flights.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Drop every entry whose key satisfies predicate(key)."""
+        with self._lock:
+            for key in [k for k in self.backend.keys() if predicate(k)]:
+                self.backend.delete(key)
+
+    def keys(self):
+        """Keys of every unexpired entry."""
+        return self.backend.keys()
+
+    def __len__(self):
+        return len(self.backend)
@@ -0,0 +1,91 @@
+import contextvars
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+
+# ==== Env Variables ====
+# Upper bound on worker threads a single fan-out may use
+MAX_WORKERS = int(os.getenv("JIRA_MAX_WORKERS", "8"))
+
+
+def run_concurrently(fn, items, max_workers=MAX_WORKERS):
+    """Apply fn to every item on a thread pool and return results in input order."""
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(item) for item in items]
+    # Workers run in a copy of the caller's context (e.g. per-callback metrics)
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(lambda item: context.copy().run(fn, item), items))
+
+
+def iter_concurrently(producers, max_workers=MAX_WORKERS, max_pending=0):
+    """Run generator factories on a thread pool and yield their items as they arrive.
+
+    Each producer is a zero-argument callable returning an iterable. Items from
+    different producers are interleaved in arrival order; the first exception
+    raised by any producer is re-raised in the caller. With max_pending > 0,
+    producers pause once that many items are waiting for a slow consumer.
+    """
+    producers = list(producers)
+    if len(producers) <= 1 or max_workers <= 1:
+        for produce in producers:
+            yield from produce()
+        return
+
+    results = queue.Queue(max_pending)
+    done = object()
+    stop = threading.Event()
+
+    def put(entry):
+        # Give up once the consumer has gone away, so blocked producers exit
+        while not stop.is_set():
+            try:
+                results.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def drain(produce):
+        try:
+            for item in produce():
+                if not put((item, None)):
+                    return
+        except BaseException as exc:
+            put((None, exc))
+            return
+        put((done, None))
+
+    def work():
+        while not stop.is_set():
+            try:
+                produce = pending.get_nowait()
+            except queue.Empty:
+                return
+            context.copy().run(drain, produce)
+
+    # Daemon threads rather than a ThreadPoolExecutor: a consumer that stops
+    # reading without closing us (e.g. on SystemExit) must not block exit
+    context = contextvars.copy_context()
+    pending = queue.Queue()
+    for produce in producers:
+        pending.put(produce)
+    for i in range(min(max_workers, len(producers))):
+        threading.Thread(target=work, name=f"iter-concurrently-{i}", daemon=True).start()
+    try:
+        remaining = len(producers)
+        while remaining:
+            item, exc = results.get()
+            if exc is not None:
+                raise exc
+            if item is done:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,78 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+
+# ==== Env Variables ====
+JIRA_URL = os.getenv("JIRA_URL")
+JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
+JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
+if not all([JIRA_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN]): raise RuntimeError("Jira env vars not set")
+# Max concurrent HTTP requests to Jira across all threads in this process
+MAX_IN_FLIGHT = int(os.getenv("JIRA_MAX_IN_FLIGHT", "8"))
+# Seconds to establish a connection / to wait between bytes of a response
+CONNECT_TIMEOUT = float(os.getenv("JIRA_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("JIRA_READ_TIMEOUT", "60"))
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default (connect, read) timeout to every request."""
+
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(pool_size=MAX_IN_FLIGHT):
+    """Build an authenticated Jira session with a sized keep-alive pool and timeouts."""
+    session = requests.Session()
+    session.auth = HTTPBasicAuth(JIRA_USER_EMAIL, JIRA_API_TOKEN)
+    session.headers.update({
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    # Keep enough pooled connections for every in-flight request
+    adapter = TimeoutHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.jira_pid = os.getpid()
+    return session
+
+
+# ==== SHARED SESSION ====
+# One pooled session per process: urllib3's pool is thread-safe, so every
+# thread reuses warm TLS connections. Forked workers (e.g. gunicorn) must
+# not share sockets with their parent, so a new pid gets a new session.
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session():
+    """Return this process's shared Jira session, creating it on first use."""
+    pid = os.getpid()
+    session = _sessions.get(pid)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(pid)
+            if session is None:
+                _sessions.clear()
+                session = _sessions[pid] = create_session()
+    return session
+
+
+def for_current_process(session):
+    """Swap a session inherited from a parent process for this process's own."""
+    if session is None or getattr(session, "jira_pid", os.getpid()) != os.getpid():
+        return get_session()
+    return session
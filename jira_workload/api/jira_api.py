@@ -1,51 +1,122 @@
-import requests
-from requests.auth import HTTPBasicAuth
 import pandas as pd
 
+import logging
+import math
 import os
-from dotenv import load_dotenv, find_dotenv
-load_dotenv(find_dotenv())
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from jira_workload.api.cache import TTLCache
+from jira_workload.api.concurrency import MAX_WORKERS, run_concurrently, iter_concurrently
+from jira_workload.api.connection import (
+    JIRA_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN, MAX_IN_FLIGHT, for_current_process, get_session,
+)
+from jira_workload.api.records import parse_issues
+from jira_workload.metrics import JIRA_RETRIES, JIRA_SEARCH_PAGES, JIRA_THROTTLE_SECONDS, record_http
+
+logger = logging.getLogger(__name__)
 
 # ==== Env Variables ====
-JIRA_URL = os.getenv("JIRA_URL")
-JIRA_USER_EMAIL = os.getenv("JIRA_USER_EMAIL")
-JIRA_API_TOKEN = os.getenv("JIRA_API_TOKEN")
-if not all([JIRA_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN]): raise RuntimeError("Jira env vars not set")
+# Retries for throttled (429) or unavailable (503) responses
+MAX_RETRIES = int(os.getenv("JIRA_MAX_RETRIES", "5"))
+MAX_BACKOFF_SECONDS = float(os.getenv("JIRA_MAX_BACKOFF_SECONDS", "60"))
+# How long fetched issues (and what is built from them) are reused before re-fetching
+SEARCH_CACHE_TTL = float(os.getenv("JIRA_CACHE_TTL_SECONDS", "300"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("JIRA_CACHE_MAX_ENTRIES", "256"))
 
 # ==== CONNECTION ====
 def connect_to_jira():
-    """Return a requests.Session() with Jira Cloud authentication"""
-    session = requests.Session()
-    session.auth = HTTPBasicAuth(JIRA_USER_EMAIL, JIRA_API_TOKEN)
-    session.headers.update({
-        "Accept": "application/json",
-        "Content-Type": "application/json"
-    })
-    return session
+    """Return this process's shared, pooled Jira Cloud session (see connection.py)"""
+    return get_session()
+
+# ==== RATE LIMITING ====
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+_throttle_lock = threading.Lock()
+_throttled_until = 0.0
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before retrying: Retry-After if given, else jittered exponential backoff."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                return min(max(delay, 0.0), MAX_BACKOFF_SECONDS)
+            except (TypeError, ValueError):
+                pass
+    return min(2 ** attempt + random.uniform(0, 1), MAX_BACKOFF_SECONDS)
+
+def _send(session, method, url, **kwargs):
+    """Send a Jira request, honouring the in-flight limit and backing off on 429/503.
+
+    A throttled response pauses every thread in the process, not just the caller,
+    so concurrent fan-outs stop hammering Jira until the Retry-After window passes.
+    """
+    global _throttled_until
+    session = for_current_process(session)
+    endpoint = urlparse(url).path
+    for attempt in range(MAX_RETRIES + 1):
+        wait = _throttled_until - time.time()
+        if wait > 0:
+            JIRA_THROTTLE_SECONDS.inc(wait)
+            time.sleep(wait)
+        with _in_flight:
+            start = time.perf_counter()
+            response = session.request(method, url, **kwargs)
+            elapsed = time.perf_counter() - start
+        record_http(endpoint, response.status_code, elapsed, len(response.content))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s %s -> %s in %.3fs", method, endpoint, response.status_code, elapsed)
+        if response.status_code not in (429, 503) or attempt == MAX_RETRIES:
+            return response
+        delay = _retry_delay(response, attempt)
+        JIRA_RETRIES.inc(status=response.status_code)
+        logger.warning("Jira returned %s for %s; retrying in %.1fs", response.status_code, endpoint, delay)
+        with _throttle_lock:
+            _throttled_until = max(_throttled_until, time.time() + delay)
+    return response
 
 # ==== ISSUE COUNT ====
 def count_issues(session, jql):
-    """Count issues based on JQL (v3 REST API)"""
-    url = f"{JIRA_URL}/rest/api/3/search/jql"
-    params = {"jql": jql, "maxResults": 0}
-    response = session.post(url, json=params)
+    """Approximate number of issues matching JQL, without fetching any (v3 REST API)"""
+    url = f"{JIRA_URL}/rest/api/3/search/approximate-count"
+    response = _send(session, "POST", url, json={"jql": jql})
 
     if response.status_code != 200:
         raise Exception(f"❌ Jira API error {response.status_code}: {response.text}")
 
     data = response.json()
-    return data.get("total", 0)
+    return data.get("count", 0)
 
 # ==== PROJECT COUNT ====
 def get_project_count(session):
     """Count number of projects (v3 REST API)"""
     url = f"{JIRA_URL}/rest/api/3/project/search"
-    response = session.get(url)
+    response = _send(session, "GET", url)
     if response.status_code != 200:
         raise Exception(f"❌ Jira API error {response.status_code}: {response.text}")
     data = response.json()
     return data.get("total", 0)
 
+def get_projects(session, max_results=50):
+    """Return every project as {"key", "name"} (paginated)."""
+    url = f"{JIRA_URL}/rest/api/3/project/search"
+    projects = []
+    while True:
+        response = _send(session, "GET", url, params={"startAt": len(projects), "maxResults": max_results})
+        if response.status_code != 200:
+            raise Exception(f"❌ Jira API error {response.status_code}: {response.text}")
+        data = response.json()
+        values = data.get("values", [])
+        projects.extend({"key": p.get("key"), "name": p.get("name")} for p in values)
+        if not values or data.get("isLast", False) or len(projects) >= data.get("total", 0):
+            return projects
+
 
 def get_group_members(session, group_name, max_results=100):
     """Return members of a Jira group by name (paginated)."""
@@ -53,13 +124,13 @@ def get_group_members(session, group_name, max_results=100):
     start_at = 0
     while True:
         url = f"{JIRA_URL}/rest/api/3/group/member"
-        resp = session.get(url, params={"groupname": group_name, "startAt": start_at, "maxResults": max_results})
+        resp = _send(session, "GET", url, params={"groupname": group_name, "startAt": start_at, "maxResults": max_results})
         if resp.status_code == 404:
             try:
                 details = resp.json().get("errorMessages", [])
             except Exception:
                 details = []
-            print(f"⚠️ Jira group not found, skipping: '{group_name}'. Details: {details}")
+            logger.warning("Jira group not found, skipping: '%s'. Details: %s", group_name, details)
             return []
         if resp.status_code != 200:
             raise Exception(f"❌ Jira API error {resp.status_code}: {resp.text}")
@@ -72,108 +143,210 @@ def get_group_members(session, group_name, max_results=100):
         members.extend(values)
         if data.get("isLast", False) or (start_at + len(values)) >= data.get("total", 0):
             break
-        start_at += max_results
+        # Jira may return fewer than requested (Cloud caps this endpoint at 50)
+        start_at += len(values)
 
     return members
 
+def filter_human_users(members):
+    """Keep active Atlassian (human) accounts from a group member list."""
+    return [
+        u for u in members
+        if u.get("accountType") == "atlassian" and bool(u.get("active"))
+    ]
+
+def merge_users(user_lists):
+    """Dedupe users from several lists by accountId and sort by display name."""
+    dedup = {u.get("accountId"): u for users in user_lists for u in users}.values()
+    return sorted(dedup, key=lambda u: (u.get("displayName") or "").lower())
+
 def get_users_from_groups(session, group_names):
     """Fetch active human users from multiple groups, dedupe and sort."""
-    all_users = []
-    for name in group_names:
-        grp_members = get_group_members(session, name)
-        filtered = [
-            u for u in grp_members
-            if u.get("accountType") == "atlassian" and bool(u.get("active"))
-        ]
-        all_users.extend(filtered)
-
-    # Dedupe by accountId
-    dedup = {u.get("accountId"): u for u in all_users}.values()
-    users = sorted(dedup, key=lambda u: (u.get("displayName") or "").lower())
-    return list(users) 
+    # Page through every group in parallel
+    members = run_concurrently(lambda name: get_group_members(session, name), group_names)
+    return merge_users(filter_human_users(m) for m in members)
 
-# === Function to query Jira ===
-def get_issues(jql):
+# ==== PAGINATED SEARCH ====
+SEARCH_PAGE_SIZE = int(os.getenv("JIRA_SEARCH_PAGE_SIZE", "100"))
+
+def iter_search_pages(session, jql, fields, page_size=SEARCH_PAGE_SIZE):
+    """Yield pages of issues from /search/jql, following nextPageToken to the last page."""
     url = f"{JIRA_URL}/rest/api/3/search/jql"
-    response = requests.post(
-        url,
-        json={
-            "jql": jql,
-            "maxResults": 500,
-            "fields": ["summary", "status", "assignee", "project", "duedate"]
-        },
-        auth=HTTPBasicAuth(JIRA_USER_EMAIL, JIRA_API_TOKEN),
-        headers={"Accept": "application/json", "Content-Type": "application/json"}
-    )
+    payload = {"jql": jql, "maxResults": page_size, "fields": list(fields)}
+    while True:
+        response = _send(session, "POST", url, json=payload)
+        if response.status_code != 200:
+            raise Exception(f"❌ Jira API error {response.status_code}: {response.text}")
+        data = response.json()
+        issues = data.get("issues", [])
+        JIRA_SEARCH_PAGES.inc()
+        if issues:
+            yield issues
+        token = data.get("nextPageToken")
+        if data.get("isLast") or not token:
+            break
+        payload["nextPageToken"] = token
 
-    if response.status_code != 200:
-        raise Exception(f"❌ Jira API error {response.status_code}: {response.text}")
+def iter_issues(session, jql, fields, page_size=SEARCH_PAGE_SIZE):
+    """Yield issues one at a time across all result pages."""
+    for page in iter_search_pages(session, jql, fields, page_size):
+        yield from page
+
+# ==== CACHED SEARCH ====
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+def _searches():
+    # Built on first use so importing this module opens no shared cache file
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = TTLCache(maxsize=SEARCH_CACHE_MAX_ENTRIES, ttl=SEARCH_CACHE_TTL, name="search", shared=True)
+        return _search_cache
+
+def normalize_jql(jql):
+    """Collapse whitespace so equivalent JQL strings share a cache entry."""
+    return " ".join(jql.split())
+
+def search_cache_key(jql, fields):
+    return (normalize_jql(jql), tuple(sorted(fields)))
+
+def search_issues(session, jql, fields):
+    """Return all issues for a JQL search, served from the shared TTL/LRU cache.
 
-    return response.json().get("issues", [])
+    Identical concurrent searches share a single upstream fetch. The returned
+    tuple is shared between callers and must not be mutated.
+    """
+    return _searches().get_or_load(search_cache_key(jql, fields), lambda: tuple(iter_issues(session, jql, fields)))
+
+def refresh_search(session, jql, fields):
+    """Re-fetch a search from Jira, replacing any cached result."""
+    return _searches().refresh(search_cache_key(jql, fields), lambda: tuple(iter_issues(session, jql, fields)))
+
+def invalidate_search_cache(jql=None, fields=None):
+    """Drop cached searches: one JQL/fields pair, every field set for a JQL, or everything."""
+    if jql is None:
+        _searches().invalidate()
+    elif fields is not None:
+        _searches().invalidate(search_cache_key(jql, fields))
+    else:
+        normalized = normalize_jql(jql)
+        _searches().invalidate_where(lambda key: key[0] == normalized)
+
+def invalidate_assignee_searches(account_ids):
+    """Drop cached searches whose JQL names any of account_ids (e.g. after a webhook)."""
+    account_ids = [a for a in account_ids if a]
+    if account_ids:
+        _searches().invalidate_where(lambda key: any(a in key[0] for a in account_ids))
+
+# === Function to query Jira ===
+def get_issues(jql, session=None):
+    session = session or get_session()
+    return list(search_issues(session, jql, ["summary", "status", "assignee", "project", "duedate"]))
 
 def get_user_workload(session, account_id):
     # Exclude completed work
     jql = f"assignee in (\"{account_id}\") AND statusCategory != Done"
-    url = f"{JIRA_URL}/rest/api/3/search/jql"
-    payload = {
-        "jql": jql,
-        "maxResults": 1000,
-        "fields": ["project", "timeoriginalestimate", "status"]
-    }
-    response = session.post(url, json=payload)
-    # Debug after sending the request
-    try:
-        print("[DEBUG] JQL:", jql)
-        print("[DEBUG] URL:", url)
-        print("[DEBUG] Status:", response.status_code)
-        body_preview = response.text[:400] if hasattr(response, 'text') else '<no body>'
-        print("[DEBUG] Body:", body_preview)
-    except Exception:
-        pass
-    if response.status_code != 200:
-        raise Exception(f"❌ Jira API error {response.status_code}: {response.text}")
+    logger.debug("JQL: %s", jql)
 
-    issues = response.json().get("issues", [])
-    data = []
     # Exclude statuses that indicate non-work items regardless of exact spelling/case
     exclude_keywords = ("canceled", "cancelled", "dropped", "drop", "blocked")
-    for issue in issues:
+    # Aggregate per project while pages stream in: name -> [issues, seconds, key]
+    totals = {}
+    for issue in search_issues(session, jql, ["project", "timeoriginalestimate", "status"]):
         fields = issue.get("fields", {})
         project_info = (fields.get("project") or {})
-        project = project_info.get("name")
-        project_key = project_info.get("key")
         status_name = ((fields.get("status") or {}).get("name") or "").strip().lower()
         if any(kw in status_name for kw in exclude_keywords):
             continue
-        time_estimate = fields.get("timeoriginalestimate") or 0
-        data.append([project, project_key, issue.get("key"), time_estimate])
+        entry = totals.setdefault(project_info.get("name"), [0, 0, project_info.get("key")])
+        entry[0] += 1
+        entry[1] += fields.get("timeoriginalestimate") or 0
 
-    if not data:
-        placeholder_df = pd.DataFrame(
-            [["No work assigned in the backlog", "", None, 0]],
-            columns=["Project", "Project Key", "Issue", "Time (seconds)"]
+    if not totals:
+        return pd.DataFrame(
+            [["No work assigned in the backlog", 0, 0, ""]],
+            columns=["Project", "Issues", "Time (seconds)", "Project Key"]
         )
-        grouped = placeholder_df.groupby("Project").agg({
-            "Issue": "count",
-            "Time (seconds)": "sum",
-            "Project Key": "first",
-        }).reset_index().rename(columns={"Issue": "Issues"})
-        return grouped
+    return pd.DataFrame(
+        [[name, cnt, secs, key] for name, (cnt, secs, key) in sorted(totals.items(), key=lambda kv: str(kv[0]))],
+        columns=["Project", "Issues", "Time (seconds)", "Project Key"]
+    )
 
-def get_user_issues_raw(session, account_id, start_due=None, end_due=None):
-    jql_parts = [f"assignee = {account_id}", "statusCategory != Done"]
+ISSUE_FIELDS = ["project", "timeoriginalestimate", "status", "assignee", "duedate"]
+
+# Jira rejects very long JQL; keep batched assignee clauses well under that.
+JQL_MAX_LENGTH = int(os.getenv("JIRA_JQL_MAX_LENGTH", "6000"))
+
+def build_open_issues_jql(assignee_clause, start_due=None, end_due=None):
+    """Build JQL for open issues matching an assignee clause and optional due-date window."""
+    jql_parts = [assignee_clause, "statusCategory != Done"]
     if start_due:
         jql_parts.append(f"duedate >= \"{start_due}\"")
     if end_due:
         jql_parts.append(f"duedate <= \"{end_due}\"")
-    jql = " AND ".join(jql_parts)
-    url = f"{JIRA_URL}/rest/api/3/search/jql"
-    payload = {
-        "jql": jql,
-        "maxResults": 1000,
-        "fields": ["project", "timeoriginalestimate", "status", "assignee", "duedate"]
-    }
-    response = session.post(url, json=payload)
-    if response.status_code != 200:
-        raise Exception(f"❌ Jira API error {response.status_code}: {response.text}")
-    return response.json().get("issues", [])
\ No newline at end of file
+    return " AND ".join(jql_parts)
+
+def get_user_issues_raw(session, account_id, start_due=None, end_due=None):
+    jql = build_open_issues_jql(f"assignee = {account_id}", start_due, end_due)
+    return list(search_issues(session, jql, ISSUE_FIELDS))
+
+# ==== BATCHED ASSIGNEE SEARCH ====
+def chunk_account_ids(account_ids, start_due=None, end_due=None, max_length=JQL_MAX_LENGTH, min_chunks=MAX_WORKERS):
+    """Split account IDs into chunks whose `assignee in (...)` JQL stays under max_length.
+
+    Each chunk pages through its results one request at a time, so accounts
+    are also spread over at least min_chunks chunks (when there are that
+    many) to let the pages be fetched in parallel.
+    """
+    budget = max_length - len(build_open_issues_jql("assignee in ()", start_due, end_due))
+    per_chunk = math.ceil(len(account_ids) / max(min_chunks, 1)) or 1
+    chunks, current, length = [], [], 0
+    for acc in account_ids:
+        piece = len(acc) + 3  # quotes and separating comma
+        if current and (length + piece > budget or len(current) >= per_chunk):
+            chunks.append(current)
+            current, length = [], 0
+        current.append(acc)
+        length += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def assignee_chunk_jqls(account_ids, start_due=None, end_due=None, min_chunks=MAX_WORKERS):
+    """Build one open-issues JQL per chunk of (deduplicated) account IDs.
+
+    Pass min_chunks=1 for count-only queries, which have no pages to spread.
+    """
+    account_ids = list(dict.fromkeys(a for a in account_ids if a))
+    jqls = []
+    for chunk in chunk_account_ids(account_ids, start_due, end_due, min_chunks=min_chunks):
+        acc_list = ",".join(f'"{a}"' for a in chunk)
+        jqls.append(build_open_issues_jql(f"assignee in ({acc_list})", start_due, end_due))
+    return jqls
+
+def stream_assignee_issue_pages(session, account_ids, start_due=None, end_due=None, max_pending=8):
+    """Yield pages of open IssueRecords for many assignees straight from Jira as they arrive.
+
+    Nothing is cached here (callers cache per assignee, see app/planner.py;
+    the search cache above would hold every page at once)
+    and at most max_pending pages wait for the consumer, so org-wide
+    exports run in bounded memory.
+    """
+    def chunk_pages(jql):
+        return lambda: (parse_issues(page) for page in iter_search_pages(session, jql, ISSUE_FIELDS))
+
+    jqls = assignee_chunk_jqls(account_ids, start_due, end_due)
+    yield from iter_concurrently((chunk_pages(jql) for jql in jqls), max_pending=max_pending)
+
+def get_issues_for_assignees(session, account_ids, start_due=None, end_due=None):
+    """Fetch open issues for many assignees with one search per chunk.
+
+    Returns a dict mapping every requested accountId to its list of IssueRecords.
+    """
+    by_assignee = {acc: [] for acc in account_ids if acc}
+    for page in stream_assignee_issue_pages(session, account_ids, start_due, end_due):
+        for record in page:
+            if record.assignee_id in by_assignee:
+                by_assignee[record.assignee_id].append(record)
+    return by_assignee
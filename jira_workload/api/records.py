@@ -0,0 +1,45 @@
+import sys
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class IssueRecord:
+    """The fields of a Jira issue the dashboard reads, without the nested JSON.
+
+    Project keys/names and account IDs are interned, so thousands of issues in
+    the same project or for the same assignee share one string object.
+    """
+    __slots__ = ("key", "project_key", "project_name", "assignee_id", "estimate", "duedate")
+
+    def __init__(self, key, project_key, project_name, assignee_id, estimate, duedate):
+        self.key = key
+        self.project_key = _intern(project_key)
+        self.project_name = _intern(project_name)
+        self.assignee_id = _intern(assignee_id)
+        self.estimate = estimate or 0
+        self.duedate = _intern(duedate)
+
+    @classmethod
+    def from_json(cls, issue):
+        """Build a record from one issue of a /search/jql response."""
+        f = issue.get("fields") or {}
+        project = f.get("project") or {}
+        return cls(
+            issue.get("key"),
+            project.get("key"),
+            project.get("name"),
+            (f.get("assignee") or {}).get("accountId"),
+            f.get("timeoriginalestimate"),
+            f.get("duedate"),
+        )
+
+    def __repr__(self):
+        return (f"IssueRecord(key={self.key!r}, project_key={self.project_key!r}, "
+                f"assignee_id={self.assignee_id!r}, estimate={self.estimate!r}, duedate={self.duedate!r})")
+
+
+def parse_issues(issues):
+    """Convert a page of issue JSON into a list of IssueRecord."""
+    return [IssueRecord.from_json(issue) for issue in issues]
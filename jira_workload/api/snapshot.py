@@ -0,0 +1,220 @@
+import fcntl
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from jira_workload.api.records import IssueRecord
+
+# Completed snapshots kept on disk; older ones may still be mapped by a worker
+KEEP_SNAPSHOTS = 2
+
+# Column files, memory-mapped read-only on load
+_COLUMNS = ("account_offsets", "project", "estimate", "due", "key_offsets", "keys")
+
+
+class Snapshot:
+    """Read-only, memory-mapped copy of group membership and open issues.
+
+    Issue columns are NumPy arrays sorted by assignee, so one account's issues
+    are a contiguous slice found through `account_offsets`. Every process
+    mapping the same files shares their pages through the OS page cache.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        self.created = meta["created"]
+        self.groups = meta["groups"]
+        self.accounts = meta["accounts"]
+        self.projects = [tuple(p) for p in meta["projects"]]
+        self._account_index = {acc: i for i, acc in enumerate(self.accounts)}
+        for name in _COLUMNS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.project)
+
+    def _window_rows(self, lo, hi, start_due=None, end_due=None):
+        """Rows in [lo, hi) due inside the window; an open window keeps undated rows too."""
+        rows = np.arange(lo, hi)
+        if start_due or end_due:
+            due = self.due[lo:hi]
+            mask = ~np.isnat(due)
+            if start_due:
+                mask &= due >= np.datetime64(str(start_due)[:10], "D")
+            if end_due:
+                mask &= due <= np.datetime64(str(end_due)[:10], "D")
+            rows = rows[mask]
+        return rows
+
+    def _records(self, lo, hi, account_id):
+        rows = np.arange(lo, hi)
+        if not len(rows):
+            return []
+        base = int(self.key_offsets[lo])
+        blob = self.keys[base:int(self.key_offsets[hi])].tobytes()
+        starts = (self.key_offsets[rows] - base).tolist()
+        ends = (self.key_offsets[rows + 1] - base).tolist()
+        dues = self.due[rows].astype(str).tolist()
+        records = []
+        for start, end, p, est, due in zip(starts, ends, self.project[rows].tolist(), self.estimate[rows].tolist(), dues):
+            key, name = self.projects[p]
+            records.append(IssueRecord(blob[start:end].decode("utf-8"), key, name, account_id, est, None if due == "NaT" else due))
+        return records
+
+    def issues_by_account(self, account_ids=None):
+        """{accountId: [IssueRecord, ...]} for the known accounts in account_ids (default: all)."""
+        wanted = self.accounts if account_ids is None else [a for a in dict.fromkeys(account_ids) if a in self._account_index]
+        issues = {}
+        for acc in wanted:
+            i = self._account_index[acc]
+            issues[acc] = self._records(int(self.account_offsets[i]), int(self.account_offsets[i + 1]), acc)
+        return issues
+
+    def covers(self, account_ids):
+        """True if every account in account_ids has its issues in this snapshot."""
+        return all(a in self._account_index for a in account_ids if a)
+
+    def estimate_seconds(self, account_ids, start_due=None, end_due=None):
+        """Total estimate seconds of the open issues of account_ids in a due-date window.
+
+        None unless the snapshot covers every account, so a partial total is
+        never shown as the whole.
+        """
+        if not self.covers(account_ids):
+            return None
+        total = 0
+        for acc in set(a for a in account_ids if a):
+            i = self._account_index[acc]
+            rows = self._window_rows(int(self.account_offsets[i]), int(self.account_offsets[i + 1]), start_due, end_due)
+            total += int(self.estimate[rows].sum())
+        return total
+
+    def project_estimate_seconds(self, start_due=None, end_due=None):
+        """{project key: estimate seconds} over every account in the snapshot."""
+        rows = self._window_rows(0, len(self), start_due, end_due)
+        sums = np.bincount(self.project[rows], weights=self.estimate[rows], minlength=len(self.projects))
+        return {key: int(seconds) for (key, _), seconds in zip(self.projects, sums)}
+
+
+def write_snapshot(directory, groups, issues):
+    """Write membership and open issues as a new snapshot and make it current.
+
+    groups maps group name to its member dicts; issues maps the members
+    whose issues are known to their IssueRecords. Members missing from
+    issues are left out, rather than saved as having no open issues.
+    Returns the new snapshot's path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    members = {u["accountId"] for users in groups.values() for u in users if u.get("accountId")}
+    accounts = sorted(members.intersection(issues))
+    account_index = {acc: i for i, acc in enumerate(accounts)}
+    project_index = {}
+    acc_col, proj_col, est_col, due_col, keys = [], [], [], [], []
+    for acc in accounts:
+        for r in issues[acc]:
+            a = account_index.get(r.assignee_id)
+            if a is None:
+                continue
+            acc_col.append(a)
+            proj_col.append(project_index.setdefault((r.project_key, r.project_name), len(project_index)))
+            est_col.append(r.estimate)
+            due_col.append(r.duedate or "NaT")
+            keys.append((r.key or "").encode("utf-8"))
+
+    order = np.argsort(np.asarray(acc_col, dtype=np.int32), kind="stable")
+    key_lengths = np.fromiter((len(keys[i]) for i in order), dtype=np.int64, count=len(order))
+    columns = {
+        "account_offsets": np.searchsorted(np.asarray(acc_col, dtype=np.int32)[order], np.arange(len(accounts) + 1)).astype(np.int64),
+        "project": np.asarray(proj_col, dtype=np.int32)[order],
+        "estimate": np.asarray(est_col, dtype=np.int64)[order],
+        "due": np.asarray(due_col, dtype="datetime64[D]")[order],
+        "key_offsets": np.concatenate([[0], np.cumsum(key_lengths)]).astype(np.int64),
+        "keys": np.frombuffer(b"".join(keys[i] for i in order), dtype=np.uint8),
+    }
+
+    name = f"{time.time():.6f}"
+    tmp = os.path.join(directory, f".{name}.tmp")
+    os.makedirs(tmp)
+    for col, values in columns.items():
+        np.save(os.path.join(tmp, f"{col}.npy"), values)
+    meta = {"created": time.time(), "groups": groups, "accounts": accounts, "projects": list(project_index)}
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    final = os.path.join(directory, name)
+    os.rename(tmp, final)
+    _set_current(directory, name)
+    _prune(directory)
+    return final
+
+
+def _set_current(directory, name):
+    tmp = os.path.join(directory, ".CURRENT.tmp")
+    with open(tmp, "w") as fh:
+        fh.write(name)
+    os.replace(tmp, os.path.join(directory, "CURRENT"))
+
+
+def _prune(directory):
+    done = sorted((d for d in os.listdir(directory) if not d.startswith(".") and d != "CURRENT"), key=float)
+    for old in done[:-KEEP_SNAPSHOTS]:
+        # Workers still mapping these keep their pages until they unmap
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+
+
+def current_snapshot_path(directory):
+    """Path of the current snapshot in directory, or None if none was written yet."""
+    try:
+        with open(os.path.join(directory, "CURRENT")) as fh:
+            return os.path.join(directory, fh.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+class SnapshotDir:
+    """The snapshots in one directory: the loaded current one, and the writer lock."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._snapshot = None
+
+    def current(self):
+        """The current Snapshot, reloaded if another process has written a newer one."""
+        path = current_snapshot_path(self.directory)
+        if path is None:
+            return None
+        if self._snapshot is None or self._snapshot.path != path:
+            try:
+                self._snapshot = Snapshot(path)
+            except FileNotFoundError:
+                # Pruned between reading CURRENT and opening it; keep the one we have
+                pass
+        return self._snapshot
+
+    def refresh(self, groups, issues_for, min_interval=0):
+        """Write a new snapshot unless another process is writing or wrote one recently.
+
+        issues_for(account_ids) returns {accountId: IssueRecords} for the
+        accounts whose issues it knows; nothing is written while it knows
+        none. Returns True if a snapshot was written.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            latest = self.current()
+            if latest is not None and time.time() - latest.created < min_interval:
+                return False
+            account_ids = sorted({u["accountId"] for members in groups.values() for u in members if u.get("accountId")})
+            issues = issues_for(account_ids)
+            if not issues:
+                # Nothing loaded yet; keep the previous snapshot
+                return False
+            write_snapshot(self.directory, groups, issues)
+            return True
@@ -0,0 +1,245 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from jira_workload.api.concurrency import iter_concurrently
+from jira_workload.api.jira_api import ISSUE_FIELDS, JQL_MAX_LENGTH, assignee_chunk_jqls, chunk_account_ids, iter_search_pages
+from jira_workload.api.records import IssueRecord
+
+# ==== Env Variables ====
+# Force a full reload this often to pick up hard-deleted issues
+FULL_SYNC_SECONDS = float(os.getenv("JIRA_STORE_FULL_SYNC_SECONDS", str(24 * 3600)))
+# Extra look-back on delta syncs to cover clock skew between us and Jira
+SYNC_OVERLAP_MINUTES = int(os.getenv("JIRA_STORE_SYNC_OVERLAP_MINUTES", "5"))
+# Longest a sync may run before another process assumes it died and takes over
+SYNC_LEASE_SECONDS = float(os.getenv("JIRA_STORE_SYNC_LEASE_SECONDS", "1800"))
+
+STORE_FIELDS = ISSUE_FIELDS + ["updated"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    project_key TEXT,
+    project_name TEXT,
+    assignee TEXT,
+    status TEXT,
+    estimate INTEGER,
+    duedate TEXT,
+    updated TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_assignee_duedate ON issues (assignee, duedate);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# SQLite caps bound parameters per statement; stay well below it
+_IN_CHUNK = 500
+
+
+def _issue_row(issue):
+    f = issue.get("fields", {})
+    project = f.get("project") or {}
+    return (
+        issue.get("key"),
+        project.get("key"),
+        project.get("name"),
+        (f.get("assignee") or {}).get("accountId"),
+        (f.get("status") or {}).get("name"),
+        f.get("timeoriginalestimate"),
+        f.get("duedate"),
+        f.get("updated"),
+    )
+
+
+def _is_done(issue):
+    status = issue.get("fields", {}).get("status") or {}
+    return (status.get("statusCategory") or {}).get("key") == "done"
+
+
+class IssueStore:
+    """SQLite copy of the open issues assigned to a tracked set of users.
+
+    The first `sync` loads every open issue for the tracked accounts; later
+    calls only fetch issues of (or reassigned from) tracked users updated since
+    the previous sync, upserting ones that are still open and assigned to a
+    tracked user and deleting the rest.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._sync_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _get_meta(self, conn, name, default=None):
+        row = conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, conn, name, value):
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def is_ready(self):
+        """True once at least one full sync has completed."""
+        with self._connect() as conn:
+            return self._get_meta(conn, "last_full_sync") is not None
+
+    # ==== SYNC ====
+    def _claim_sync(self, now, min_interval):
+        # Several processes may share one store file; only one syncs at a time
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            last_sync = self._get_meta(conn, "last_sync")
+            if self._get_meta(conn, "sync_lease", 0) > now:
+                return False
+            if last_sync is not None and now - last_sync < min_interval:
+                return False
+            self._set_meta(conn, "sync_lease", now + SYNC_LEASE_SECONDS)
+            return True
+
+    def sync(self, session, account_ids, min_interval=0):
+        """Bring the store up to date for account_ids, using a delta sync when possible.
+
+        Returns False without syncing if another process is syncing or did so
+        less than min_interval seconds ago.
+        """
+        with self._sync_lock:
+            started = time.time()
+            if not self._claim_sync(started, min_interval):
+                return False
+            try:
+                self._sync(session, account_ids, started)
+            finally:
+                with self._connect() as conn:
+                    self._set_meta(conn, "sync_lease", 0)
+            return True
+
+    def _sync(self, session, account_ids, started):
+        wanted = sorted(set(a for a in account_ids if a))
+        with self._connect() as conn:
+            last_sync = self._get_meta(conn, "last_sync")
+            last_full = self._get_meta(conn, "last_full_sync")
+            tracked = set(self._get_meta(conn, "tracked", []))
+
+        if last_sync is None or last_full is None or started - last_full >= FULL_SYNC_SECONDS:
+            self._full_sync(session, wanted)
+            with self._connect() as conn:
+                self._set_meta(conn, "last_full_sync", started)
+        else:
+            removed = tracked - set(wanted)
+            added = [a for a in wanted if a not in tracked]
+            with self._connect() as conn:
+                self._delete_assignees(conn, removed)
+                if added:
+                    self._upsert_pages(conn, self._iter_open_pages(session, added))
+            self._delta_sync(session, set(wanted), last_sync)
+
+        with self._connect() as conn:
+            self._set_meta(conn, "tracked", wanted)
+            self._set_meta(conn, "last_sync", started)
+
+    def _iter_open_pages(self, session, account_ids):
+        def chunk_pages(jql):
+            return lambda: iter_search_pages(session, jql, STORE_FIELDS)
+        return iter_concurrently(chunk_pages(jql) for jql in assignee_chunk_jqls(account_ids))
+
+    def _full_sync(self, session, account_ids):
+        # One transaction: readers keep seeing the previous snapshot until commit
+        with self._connect() as conn:
+            conn.execute("DELETE FROM issues")
+            self._upsert_pages(conn, self._iter_open_pages(session, account_ids))
+
+    def _delta_sync(self, session, wanted, since):
+        # Relative JQL dates avoid depending on the Jira user's timezone
+        minutes = math.ceil((time.time() - since) / 60) + SYNC_OVERLAP_MINUTES
+        # Scoped to tracked users; `was in` also catches issues reassigned away from them
+        def chunk_pages(chunk):
+            acc_list = ",".join(f'"{a}"' for a in chunk)
+            jql = f"(assignee in ({acc_list}) OR assignee was in ({acc_list})) AND updated >= \"-{minutes}m\" ORDER BY updated ASC"
+            return lambda: iter_search_pages(session, jql, STORE_FIELDS)
+
+        # Each account appears twice in the JQL, so halve the length budget
+        chunks = chunk_account_ids(sorted(wanted), max_length=JQL_MAX_LENGTH // 2, min_chunks=1)
+        with self._connect() as conn:
+            for page in iter_concurrently(chunk_pages(chunk) for chunk in chunks):
+                keep, drop = [], []
+                for issue in page:
+                    assignee = (issue.get("fields", {}).get("assignee") or {}).get("accountId")
+                    if assignee in wanted and not _is_done(issue):
+                        keep.append(_issue_row(issue))
+                    else:
+                        drop.append((issue.get("key"),))
+                conn.executemany("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?)", keep)
+                conn.executemany("DELETE FROM issues WHERE key = ?", drop)
+
+    def apply_issue(self, issue, deleted=False):
+        """Apply one pushed issue (e.g. from a webhook): keep it if open and tracked, else drop it."""
+        assignee = (issue.get("fields", {}).get("assignee") or {}).get("accountId")
+        with self._connect() as conn:
+            tracked = set(self._get_meta(conn, "tracked", []))
+            if deleted or _is_done(issue) or assignee not in tracked:
+                conn.execute("DELETE FROM issues WHERE key = ?", (issue.get("key"),))
+            else:
+                conn.execute("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _issue_row(issue))
+
+    def _upsert_pages(self, conn, pages):
+        for page in pages:
+            conn.executemany(
+                "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [_issue_row(issue) for issue in page],
+            )
+
+    def _delete_assignees(self, conn, account_ids):
+        account_ids = list(account_ids)
+        for i in range(0, len(account_ids), _IN_CHUNK):
+            chunk = account_ids[i:i + _IN_CHUNK]
+            conn.execute(f"DELETE FROM issues WHERE assignee IN ({','.join('?' * len(chunk))})", chunk)
+
+    # ==== READ ====
+    def issues_for_assignees(self, account_ids):
+        """Return {accountId: [IssueRecord, ...]} for open issues."""
+        account_ids = list(dict.fromkeys(a for a in account_ids if a))
+        by_assignee = {acc: [] for acc in account_ids}
+        with self._connect() as conn:
+            for i in range(0, len(account_ids), _IN_CHUNK):
+                chunk = account_ids[i:i + _IN_CHUNK]
+                rows = conn.execute(
+                    "SELECT key, project_key, project_name, assignee, estimate, duedate "
+                    f"FROM issues WHERE assignee IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for row in rows:
+                    by_assignee[row[3]].append(IssueRecord(*row))
+        return by_assignee
+
+    def iter_assignee_pages(self, account_ids, page_size=1000):
+        """Yield lists of IssueRecords for account_ids, page_size rows at a time."""
+        account_ids = list(dict.fromkeys(a for a in account_ids if a))
+        with self._connect() as conn:
+            for i in range(0, len(account_ids), _IN_CHUNK):
+                chunk = account_ids[i:i + _IN_CHUNK]
+                cursor = conn.execute(
+                    "SELECT key, project_key, project_name, assignee, estimate, duedate "
+                    f"FROM issues WHERE assignee IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                while True:
+                    rows = cursor.fetchmany(page_size)
+                    if not rows:
+                        break
+                    yield [IssueRecord(*row) for row in rows]
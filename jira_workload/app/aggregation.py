@@ -0,0 +1,159 @@
+from urllib.parse import quote_plus
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_WEEK = 40
+HOURS_PER_DAY = 8
+
+WORKLOAD_COLUMNS = ["Project", "Employee", "Issues", "Workload (hours)", "Workload (weeks, days, hours)"]
+
+
+def fmt_weeks_days_hours(seconds: float) -> str:
+    """Format a single estimate as 'W weeks, D days, H hours' (40h weeks, 8h days)."""
+    return format_weeks_days_hours(pd.Series([seconds or 0]))[0]
+
+
+def format_weeks_days_hours(seconds: pd.Series) -> pd.Series:
+    """Vectorized fmt_weeks_days_hours over a Series of estimate seconds."""
+    total_hours = seconds.fillna(0).to_numpy(dtype=float) / 3600
+    weeks = (total_hours // HOURS_PER_WEEK).astype(int)
+    rem_hours = total_hours - weeks * HOURS_PER_WEEK
+    days = (rem_hours // HOURS_PER_DAY).astype(int)
+    hours = np.round(rem_hours - days * HOURS_PER_DAY).astype(int)
+
+    def unit(values, singular):
+        return values.astype(str) + np.where(values == 1, f" {singular}", f" {singular}s")
+
+    text = unit(weeks, "week").astype(object) + ", " + unit(days, "day") + ", " + unit(hours, "hour")
+    return pd.Series(text, index=seconds.index)
+
+
+def project_links(names: pd.Series, keys: pd.Series, jira_url: str) -> pd.Series:
+    """Markdown links to each project's browse page; plain names where no key is known."""
+    names = names.fillna("").astype(str).str.strip()
+    keys = keys.fillna("").astype(str).str.strip() if keys is not None else pd.Series("", index=names.index)
+    if not jira_url:
+        return names
+    linked = "[" + names + "](" + jira_url + "/browse/" + keys + ")"
+    return linked.where((keys != "") & (names != ""), names)
+
+
+def _quoted_clause(values: pd.Series, template: str) -> pd.Series:
+    """quote_plus(template.format(v) + ' AND ') per row, computed once per distinct value."""
+    values = values.fillna("").astype(str).str.strip()
+    quoted = {v: quote_plus(template.format(v) + " AND ") if v else "" for v in values.unique()}
+    return values.map(quoted)
+
+
+def _assignees_clause(assignee_ids):
+    acc_list = ",".join(f'"{a}"' for a in assignee_ids)
+    return quote_plus(f"assignee in ({acc_list}) AND ")
+
+
+def _window_suffix(start_date=None, end_date=None):
+    parts = ["statusCategory != Done"]
+    if start_date:
+        parts.append(f"duedate >= \"{start_date}\"")
+    if end_date:
+        parts.append(f"duedate <= \"{end_date}\"")
+    return quote_plus(" AND ".join(parts))
+
+
+def issues_links(grouped: pd.DataFrame, mode: str, assignee_ids, start_date=None, end_date=None, jira_url="") -> pd.Series:
+    """Markdown links from each row's issue count to the matching Jira issue search.
+
+    The JQL narrows by project for project modes and by assignee for employee
+    modes; plain project mode scopes to every account in assignee_ids.
+    """
+    counts = grouped["Issues"].fillna(0).astype(int)
+    if not jira_url:
+        return counts.astype(str)
+
+    prefix = pd.Series("", index=grouped.index)
+    if mode in ("project", "project_employee") and "Project Key" in grouped:
+        prefix = prefix + _quoted_clause(grouped["Project Key"], "project={}")
+    if mode in ("employee", "project_employee") and "AccountId" in grouped:
+        prefix = prefix + _quoted_clause(grouped["AccountId"], 'assignee in ("{}")')
+    elif mode == "project" and assignee_ids:
+        prefix = prefix + _assignees_clause(assignee_ids)
+    suffix = _window_suffix(start_date, end_date)
+
+    links = "[" + counts.astype(str) + "](" + jira_url + "/issues/?jql=" + prefix + suffix + ")"
+    return links.where(counts != 0, "0")
+
+
+def build_workload_records(grouped, mode, assignee_ids, start_date=None, end_date=None, jira_url="", columns=WORKLOAD_COLUMNS):
+    """Turn grouped Issues/Time (seconds) rows into DataTable records plus a Total row.
+
+    `grouped` is the output of WorkloadCube.reduce (or a placeholder frame of
+    the same shape); only `columns` are kept in the returned records.
+    """
+    seconds = grouped["Time (seconds)"]
+    out = pd.DataFrame(index=grouped.index)
+    if "Project" in columns:
+        project = grouped["Project"] if "Project" in grouped else pd.Series("", index=grouped.index)
+        out["Project"] = project_links(project, grouped.get("Project Key"), jira_url)
+    if "Employee" in columns:
+        out["Employee"] = grouped["Employee"] if "Employee" in grouped else ""
+    out["Issues"] = issues_links(grouped, mode, assignee_ids, start_date, end_date, jira_url)
+    out["Workload (hours)"] = (seconds / 3600).round(2)
+    out["Workload (weeks, days, hours)"] = format_weeks_days_hours(seconds)
+
+    total_seconds = float(seconds.sum())
+    total = {
+        "Project": "Total",
+        "Employee": "",
+        "Issues": str(int(grouped["Issues"].sum())),
+        "Workload (hours)": round(total_seconds / 3600, 2),
+        "Workload (weeks, days, hours)": fmt_weeks_days_hours(total_seconds),
+    }
+    records = out[[c for c in columns if c in out.columns]].to_dict("records")
+    records.append({c: total[c] for c in columns})
+    return records
+
+
+def build_group_table(cube, mode, display_names, assignee_ids, start_date=None, end_date=None, jira_url=""):
+    """Group Workload table records for one grouping mode, as assets/group_table.js renders them."""
+    grouped = cube.reduce(mode, start_date, end_date, display_names)
+    if grouped.empty:
+        grouped = pd.DataFrame([{
+            "Project": "No work assigned in the backlog", "Employee": "", "Issues": 0,
+            "Time (seconds)": 0, "Project Key": "", "AccountId": "",
+        }])
+    return build_workload_records(grouped, mode, assignee_ids, start_date, end_date, jira_url)
+
+
+def _nullable(values):
+    return [None if pd.isna(v) else v for v in values]
+
+
+def build_group_payload(cube, display_names, assignee_ids, start_date=None, end_date=None, jira_url=""):
+    """Compact per-(project, employee) totals for a group and window.
+
+    The browser pivots this into the project / employee / project_employee
+    tables (assets/group_table.js), so switching modes needs no server call.
+    Links and JQL fragments are pre-rendered here so both sides format rows
+    identically to build_workload_records.
+    """
+    p, a, issues, seconds = cube.totals(start_date, end_date)
+    proj_codes, p_idx = np.unique(p, return_inverse=True)
+    acc_codes, a_idx = np.unique(a, return_inverse=True)
+    names = pd.Series(cube.projects[proj_codes], dtype=object)
+    keys = pd.Series(cube.project_keys[proj_codes], dtype=object)
+    accounts = pd.Series(cube.accounts[acc_codes], dtype=object)
+    return {
+        "projects": {
+            "name": _nullable(names),
+            "link": project_links(names, keys, jira_url).tolist(),
+            "clause": _quoted_clause(keys, "project={}").tolist(),
+        },
+        "employees": {
+            "name": [display_names.get(x) for x in accounts],
+            "clause": _quoted_clause(accounts, 'assignee in ("{}")').tolist(),
+        },
+        "cells": {"p": p_idx.tolist(), "e": a_idx.tolist(), "n": issues.tolist(), "s": seconds.tolist()},
+        "assigneeClause": _assignees_clause(assignee_ids) if assignee_ids else "",
+        "suffix": _window_suffix(start_date, end_date),
+        "jiraUrl": jira_url,
+    }
@@ -0,0 +1,127 @@
+// Pivots the payload from update_group_payload (aggregation.build_group_payload)
+// into group table rows. Mirrors aggregation.build_group_table, so switching
+// the grouping mode never reaches the server.
+(function () {
+    var HOURS_PER_WEEK = 40;
+    var HOURS_PER_DAY = 8;
+    var PLACEHOLDER = 'No work assigned in the backlog';
+    var SURROGATE = /[\uD800-\uDFFF]/;
+
+    // numpy.rint: round half to even
+    function rint(x) {
+        var f = Math.floor(x), d = x - f;
+        if (d > 0.5) return f + 1;
+        if (d < 0.5) return f;
+        return f % 2 === 0 ? f : f + 1;
+    }
+
+    // Series.round(2)
+    function round2(x) {
+        return rint(x * 100) / 100;
+    }
+
+    // Python round(x, 2): nearest on the exact value, ties (only multiples of 1/8) to even
+    function pyRound2(x) {
+        var eighths = x * 8;
+        if (Number.isInteger(eighths) && Math.abs(eighths) % 2 === 1) return rint(x * 100) / 100;
+        return Number(x.toFixed(2));
+    }
+
+    function unit(value, name) {
+        return value + ' ' + name + (value === 1 ? '' : 's');
+    }
+
+    // aggregation.format_weeks_days_hours
+    function weeksDaysHours(seconds) {
+        var total = seconds / 3600;
+        var weeks = Math.floor(total / HOURS_PER_WEEK);
+        var rem = total - weeks * HOURS_PER_WEEK;
+        var days = Math.floor(rem / HOURS_PER_DAY);
+        var hours = rint(rem - days * HOURS_PER_DAY);
+        return unit(weeks, 'week') + ', ' + unit(days, 'day') + ', ' + unit(hours, 'hour');
+    }
+
+    // Python string order (by code point); null sorts last like groupby(dropna=False)
+    function compareKey(a, b) {
+        if (a === b) return 0;
+        if (a === null) return 1;
+        if (b === null) return -1;
+        if (SURROGATE.test(a) || SURROGATE.test(b)) {
+            var ca = Array.from(a), cb = Array.from(b);
+            for (var i = 0; i < Math.min(ca.length, cb.length); i++) {
+                var d = ca[i].codePointAt(0) - cb[i].codePointAt(0);
+                if (d !== 0) return d;
+            }
+            return ca.length - cb.length;
+        }
+        return a < b ? -1 : 1;
+    }
+
+    function groupCells(payload, mode) {
+        var cells = payload.cells, projects = payload.projects, employees = payload.employees;
+        var byKey = new Map();
+        for (var i = 0; i < cells.n.length; i++) {
+            var p = cells.p[i], e = cells.e[i];
+            var project = mode === 'employee' ? null : projects.name[p];
+            var employee = mode === 'project' ? null : employees.name[e];
+            var id = JSON.stringify([project, employee]);
+            var group = byKey.get(id);
+            if (group === undefined) {
+                group = {project: project, employee: employee, p: p, e: e, n: 0, s: 0};
+                byKey.set(id, group);
+            }
+            // Helper columns take the first (lowest-code) member, like groupby(...).first()
+            group.p = Math.min(group.p, p);
+            group.e = Math.min(group.e, e);
+            group.n += cells.n[i];
+            group.s += cells.s[i];
+        }
+        return Array.from(byKey.values()).sort(function (x, y) {
+            return compareKey(x.project, y.project) || compareKey(x.employee, y.employee);
+        });
+    }
+
+    function issuesCell(payload, count, prefix) {
+        if (!payload.jiraUrl) return String(count);
+        if (count === 0) return '0';
+        return '[' + count + '](' + payload.jiraUrl + '/issues/?jql=' + prefix + payload.suffix + ')';
+    }
+
+    function groupTable(payload, mode) {
+        if (!payload) return [];
+        var projects = payload.projects, employees = payload.employees;
+        var totalIssues = 0, totalSeconds = 0;
+        var records = groupCells(payload, mode).map(function (g) {
+            var prefix = '';
+            if (mode !== 'employee') prefix += projects.clause[g.p];
+            prefix += mode === 'project' ? payload.assigneeClause : employees.clause[g.e];
+            totalIssues += g.n;
+            totalSeconds += g.s;
+            return {
+                'Project': mode === 'employee' ? '' : projects.link[g.p],
+                'Employee': mode === 'project' ? '' : employees.name[g.e],
+                'Issues': issuesCell(payload, g.n, prefix),
+                'Workload (hours)': round2(g.s / 3600),
+                'Workload (weeks, days, hours)': weeksDaysHours(g.s)
+            };
+        });
+        if (records.length === 0) {
+            records.push({
+                'Project': PLACEHOLDER, 'Employee': '', 'Issues': '0',
+                'Workload (hours)': 0, 'Workload (weeks, days, hours)': weeksDaysHours(0)
+            });
+        }
+        records.push({
+            'Project': 'Total',
+            'Employee': '',
+            'Issues': String(totalIssues),
+            'Workload (hours)': pyRound2(totalSeconds / 3600),
+            'Workload (weeks, days, hours)': weeksDaysHours(totalSeconds)
+        });
+        return records;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        workload: {groupTable: groupTable}
+    });
+})();
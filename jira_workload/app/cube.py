@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+# Marker week for issues without a due date
+UNDATED = np.iinfo(np.int64).max
+
+
+def _day(value):
+    """Days since the epoch for a YYYY-MM-DD date string."""
+    return int(np.datetime64(str(value)[:10], "D").astype(np.int64))
+
+
+def _week_start(days):
+    # 1970-01-01 was a Thursday; shift so weeks start on Monday
+    return days - (days + 3) % 7
+
+
+class WorkloadCube:
+    """Issue count and estimate seconds per (project, account, due-week) cell.
+
+    Built once per data refresh from a DueDateIndex. Grouping modes are sums
+    over the sparse cells; a date window takes whole weeks from the cells and
+    only the partial weeks at its edges from the index rows.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        frame = index.frame
+        self._row_p, self.projects = pd.factorize(frame["Project"], use_na_sentinel=False)
+        self._row_a, self.accounts = pd.factorize(frame["AccountId"], use_na_sentinel=False)
+        self._row_n = np.ones(len(frame), dtype=np.int64)
+        self._row_s = frame["Time (seconds)"].to_numpy(dtype=np.int64)
+        # First non-empty key seen for each project, like groupby(...).first()
+        keys = frame.groupby(self._row_p, sort=False)["Project Key"].first()
+        self.project_keys = keys.reindex(range(len(self.projects))).to_numpy(dtype=object)
+
+        dues = frame["Due"].to_numpy().astype("datetime64[D]")
+        weeks = np.full(len(frame), UNDATED, dtype=np.int64)
+        dated = ~np.isnat(dues)
+        weeks[dated] = _week_start(dues[dated].astype(np.int64))
+
+        cells = pd.DataFrame({
+            "p": self._row_p, "a": self._row_a, "w": weeks, "n": self._row_n, "s": self._row_s,
+        }).groupby(["p", "a", "w"], sort=False).sum().reset_index()
+        self._cell_p = cells["p"].to_numpy()
+        self._cell_a = cells["a"].to_numpy()
+        self._cell_w = cells["w"].to_numpy()
+        self._cell_n = cells["n"].to_numpy()
+        self._cell_s = cells["s"].to_numpy()
+
+    def replace_issue(self, key, record=None):
+        """A new cube without issue key, plus record if given, rebuilt from the indexed rows."""
+        return WorkloadCube(self.index.replace_issue(key, record))
+
+    def _rows(self, lo, hi):
+        return self._row_p[lo:hi], self._row_a[lo:hi], self._row_n[lo:hi], self._row_s[lo:hi]
+
+    def _window_cells(self, start_date=None, end_date=None):
+        """Return (project, account, count, seconds) arrays covering a due-date window."""
+        if not start_date and not end_date:
+            return self._cell_p, self._cell_a, self._cell_n, self._cell_s
+
+        start = _day(start_date) if start_date else None
+        end = _day(end_date) if end_date else None
+        # Whole weeks inside the window: [first_week, last_week] by week start
+        first_week = _week_start(start + 6) if start is not None else None
+        last_week = _week_start(end + 1) - 7 if end is not None else None
+        if first_week is not None and last_week is not None and first_week > last_week:
+            return self._rows(*self.index.offsets(start_date, end_date))
+
+        mask = self._cell_w != UNDATED
+        if first_week is not None:
+            mask &= self._cell_w >= first_week
+        if last_week is not None:
+            mask &= self._cell_w <= last_week
+        parts = [(self._cell_p[mask], self._cell_a[mask], self._cell_n[mask], self._cell_s[mask])]
+
+        day = np.timedelta64(1, "D")
+        if start is not None and first_week > start:
+            edge_end = np.datetime64(first_week, "D") - day
+            parts.append(self._rows(*self.index.offsets(start_date, edge_end)))
+        if end is not None and last_week + 6 < end:
+            edge_start = np.datetime64(last_week + 7, "D")
+            parts.append(self._rows(*self.index.offsets(edge_start, end_date)))
+        return tuple(np.concatenate(col) for col in zip(*parts))
+
+    def totals(self, start_date=None, end_date=None):
+        """Return (project, account, issues, seconds) per (project, account) pair in a window.
+
+        Pairs are ordered by project code, then account code.
+        """
+        p, a, n, s = self._window_cells(start_date, end_date)
+        n_acc = max(len(self.accounts), 1)
+        groups, inverse = np.unique(p * n_acc + a, return_inverse=True)
+        issues = np.bincount(inverse, weights=n, minlength=len(groups)).astype(np.int64)
+        seconds = np.bincount(inverse, weights=s, minlength=len(groups)).astype(np.int64)
+        return groups // n_acc, groups % n_acc, issues, seconds
+
+    def reduce(self, mode, start_date=None, end_date=None, display_names=None):
+        """Aggregate the window for a grouping mode ('project', 'employee', 'project_employee').
+
+        Returns one row per group with Issues and Time (seconds), plus
+        Project Key and/or AccountId helper columns, sorted like a groupby.
+        """
+        display_names = display_names or {}
+        p, a, n, s = self._window_cells(start_date, end_date)
+        if mode == "employee":
+            key = a
+        elif mode == "project_employee":
+            key = p * max(len(self.accounts), 1) + a
+        else:
+            key = p
+        groups, inverse = np.unique(key, return_inverse=True)
+        issues = np.bincount(inverse, weights=n, minlength=len(groups)).astype(np.int64)
+        seconds = np.bincount(inverse, weights=s, minlength=len(groups)).astype(np.int64)
+
+        if mode == "employee":
+            acc = self.accounts[groups] if len(groups) else np.array([], dtype=object)
+            out = pd.DataFrame({
+                "Employee": [display_names.get(x) for x in acc],
+                "Issues": issues, "Time (seconds)": seconds, "AccountId": acc,
+            })
+            grp_cols, extra = ["Employee"], {"AccountId": "first"}
+        else:
+            if mode == "project_employee":
+                n_acc = max(len(self.accounts), 1)
+                proj_codes, acc_codes = groups // n_acc, groups % n_acc
+            else:
+                proj_codes, acc_codes = groups, None
+            out = pd.DataFrame({
+                "Project": self.projects[proj_codes] if len(groups) else [],
+                "Issues": issues, "Time (seconds)": seconds,
+                "Project Key": self.project_keys[proj_codes] if len(groups) else [],
+            })
+            grp_cols, extra = ["Project"], {"Project Key": "first"}
+            if acc_codes is not None:
+                acc = self.accounts[acc_codes] if len(groups) else []
+                out.insert(1, "Employee", [display_names.get(x) for x in acc])
+                out["AccountId"] = acc
+                grp_cols, extra = ["Project", "Employee"], {"Project Key": "first", "AccountId": "first"}
+
+        # Merge groups that share a label (e.g. two accounts with one display name)
+        agg = {"Issues": "sum", "Time (seconds)": "sum", **extra}
+        return out.groupby(grp_cols, dropna=False).agg(agg).reset_index()
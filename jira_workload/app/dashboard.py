@@ -1,157 +1,403 @@
 # Activate env: .\jira_env\Scripts\Activate.ps1 
 # Navigate to project root: cd .\jira_workload_dashboard 
 # Run app: python -m jira_workload.app.dashboard
+# Production: gunicorn -w 4 -b 0.0.0.0:8050 "jira_workload.app.dashboard:create_server()"
 
+import logging
 import os
 import sys
-from urllib.parse import quote_plus
+import threading
+import time
 import pandas as pd
 
 
 from dotenv import load_dotenv
-from dash import Dash, html, dcc, Input, Output, dash_table
-from jira_workload.api.jira_api import connect_to_jira, get_users_from_groups, get_user_workload, get_group_members, get_user_issues_raw
+from dash import ClientsideFunction, Dash, DiskcacheManager, callback, clientside_callback, html, dcc, Input, Output, dash_table, no_update
+from flask import Response, request
+from jira_workload.api.cache import SHARED_CACHE_PATH, TTLCache
+from jira_workload.api.jira_api import (
+    connect_to_jira, get_projects, invalidate_assignee_searches, stream_assignee_issue_pages, SEARCH_CACHE_TTL,
+)
+from jira_workload.api.snapshot import SnapshotDir
+from jira_workload.api.store import IssueStore
+from jira_workload.app.aggregation import build_group_payload, build_workload_records
+from jira_workload.app.cube import WorkloadCube
+from jira_workload.app.due_index import DueDateIndex
+from jira_workload.app.export import FORMATS, stream_export
+from jira_workload.app.history import WorkloadHistory
+from jira_workload.app.membership import MembershipCache
+from jira_workload.app.overview import count_overview, group_records, project_records
+from jira_workload.app.planner import IssuePlanner
+from jira_workload.app.users import GROUP_NAMES, ISSUE_STORE_PATH, JIRA_URL, keep_user, normalize_name
+from jira_workload.app.webhooks import ISSUE_EVENTS, MEMBERSHIP_EVENTS, parse_issue_event, verify_signature, webhooks_enabled
+from jira_workload.metrics import aggregation_phase, instrument_callback, render_metrics
 
 load_dotenv()
 
-def normalize_name(name: str) -> str:
-    # Title-case words; preserve hyphens; uppercase dotted initials (e.g., J.s. -> J.S.)
-    if not isinstance(name, str):
-        return ""
-
-    def title_or_initials(token: str) -> str:
-        # If token contains dots, uppercase each dotted segment like initials
-        if "." in token:
-            segs = token.split(".")
-            new = []
-            for s in segs:
-                if s == "":
-                    new.append("")
-                elif len(s) == 1:
-                    new.append(s.upper())
-                else:
-                    new.append(s.capitalize())
-            return ".".join(new)
-        # Otherwise normal title-case
-        return token.capitalize()
-
-    words = []
-    for w in name.split(" "):
-        hy = []
-        for h in w.split("-"):
-            hy.append(title_or_initials(h))
-        words.append("-".join(hy))
-    return " ".join(words)
-
-app = Dash(__name__)
-
-session = connect_to_jira()
-
-# Get users from specific Jira groups (comma-separated in .env as JIRA_GROUP_NAMES)
-GROUP_NAMES = [g.strip() for g in os.getenv("JIRA_GROUP_NAMES", "").split(",") if g.strip()]
-APPLY_DOMAIN_FILTER = os.getenv("APPLY_DOMAIN_FILTER", "true").lower() == "true"
-EMAIL_DOMAIN = os.getenv("JIRA_EMAIL_DOMAIN", "@apscorp.ca").lower()
-JIRA_URL = os.getenv("JIRA_URL", "").rstrip("/")
-
-users = get_users_from_groups(session, GROUP_NAMES)
- 
-
-if APPLY_DOMAIN_FILTER:
-    def keep(u):
-        email = str(u.get("emailAddress", "")).strip().lower()
-        return (not email) or email.endswith(EMAIL_DOMAIN)
-    users = [u for u in users if keep(u)]
-# else: keep all users unfiltered
-
-
-app.layout = html.Div([
-    dcc.Tabs(id='tabs', value='tab-user', children=[
-        dcc.Tab(label='Employee Workload Dashboard', value='tab-user', children=[
-            html.Div([
-                html.H2("Employee Workload Dashboard"),
-                dcc.Dropdown(
-                    id='user-dropdown',
-                    options=[{'label': normalize_name(u.get('displayName', '')), 'value': u['accountId']} for u in users],
-                    placeholder='Select a user'
-                ),
-                dcc.DatePickerRange(
-                    id='user-date-range',
-                    minimum_nights=0,
-                    clearable=True
-                ),
-                dash_table.DataTable(
-                    id='workload-table',
-                    columns=[
-                        {"name": "Project", "id": "Project", "presentation": "markdown"},
-                        {"name": "Issues", "id": "Issues", "presentation": "markdown"},
-                        {"name": "Workload (hours)", "id": "Workload (hours)"},
-                        {"name": "Workload (weeks, days, hours)", "id": "Workload (weeks, days, hours)"},
-                    ],
-                    data=[],
-                    style_as_list_view=True,
-                    style_table={"width": "100%"},
-                    style_header={"fontWeight": "bold", "textAlign": "center"},
-                    style_cell={"textAlign": "center", "padding": "8px"},
-                    style_data={"textAlign": "center"},
-                    style_data_conditional=[
-                        {
-                            "if": {"filter_query": '{Project} = "Total"'},
-                            "fontWeight": "bold",
-                        }
-                    ],
-                )
-            ])
-        ]),
-        dcc.Tab(label='Group Workload Dashboard', value='tab-group', children=[
-            html.Div([
-                html.H2("Group Workload Dashboard"),
-                dcc.Dropdown(
-                    id='group-dropdown',
-                    options=[{'label': g, 'value': g} for g in GROUP_NAMES],
-                    placeholder='Select a group'
-                ),
-                dcc.Dropdown(
-                    id='grouping-mode',
-                    options=[
-                        {'label': 'Project', 'value': 'project'},
-                        {'label': 'Employee', 'value': 'employee'},
-                        {'label': 'Project and Employee', 'value': 'project_employee'},
-                    ],
-                    value='project'
-                ),
-                dcc.DatePickerRange(
-                    id='date-range',
-                    minimum_nights=0,
-                    clearable=True
-                ),
-                dash_table.DataTable(
-                    id='group-workload-table',
-                    columns=[
-                        {"name": "Project", "id": "Project", "presentation": "markdown"},
-                        {"name": "Employee", "id": "Employee"},
-                        {"name": "Issues", "id": "Issues", "presentation": "markdown"},
-                        {"name": "Workload (hours)", "id": "Workload (hours)"},
-                        {"name": "Workload (weeks, days, hours)", "id": "Workload (weeks, days, hours)"},
-                    ],
-                    data=[],
-                    style_as_list_view=True,
-                    style_table={"width": "100%"},
-                    style_header={"fontWeight": "bold", "textAlign": "center"},
-                    style_cell={"textAlign": "center", "padding": "8px"},
-                    style_data={"textAlign": "center"},
-                    style_data_conditional=[
-                        {
-                            "if": {"filter_query": '{Project} = "Total"'},
-                            "fontWeight": "bold",
-                        }
-                    ],
-                )
-            ])
+logger = logging.getLogger(__name__)
+
+def metrics():
+    """GET /metrics for the process that serves the request (one gunicorn worker, not the pool)."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+# The session, caches and stores below are built by build_services() (via
+# create_app), not at import time, so importing this module has no side effects
+session = None
+membership = None
+
+# ==== LOCAL ISSUE STORE ====
+# Optional SQLite copy of open issues (JIRA_ISSUE_STORE), kept current by a background delta sync
+STORE_SYNC_SECONDS = float(os.getenv("JIRA_STORE_SYNC_SECONDS", "300"))
+issue_store = None  # IssueStore when ISSUE_STORE_PATH is set
+
+def _sync_store():
+    issue_store.sync(session, [u.get('accountId') for u in membership.all_users()], min_interval=STORE_SYNC_SECONDS / 2)
+
+# ==== WARM-START SNAPSHOT ====
+# Membership and open issues saved as memory-mapped NumPy columns; a restarted
+# worker seeds its caches from the latest one instead of starting cold
+SNAPSHOT_DIR = os.getenv("JIRA_SNAPSHOT_DIR", "")
+SNAPSHOT_REFRESH_SECONDS = float(os.getenv("JIRA_SNAPSHOT_REFRESH_SECONDS", "300"))
+snapshots = None  # SnapshotDir when SNAPSHOT_DIR is set
+
+def _snapshot_issues(account_ids):
+    """Issues for the next snapshot from data this process already holds; never calls Jira.
+
+    The store if it has synced, else the planner's cached accounts, with the
+    previous snapshot standing in for accounts nobody has loaded since.
+    """
+    if issue_store is not None and issue_store.is_ready():
+        return issue_store.issues_for_assignees(account_ids)
+    issues = planner.cached(account_ids)
+    previous = snapshots.current()
+    if previous is not None:
+        issues.update(previous.issues_by_account([a for a in account_ids if a not in issues]))
+    return issues
+
+def _refresh_snapshot():
+    snapshots.refresh(membership.groups(), _snapshot_issues, min_interval=SNAPSHOT_REFRESH_SECONDS / 2)
+
+# ==== WORKLOAD HISTORY ====
+# Per-user and per-project totals sampled on an interval into an append-only store
+HISTORY_DIR = os.getenv("JIRA_HISTORY_DIR", "")
+HISTORY_INTERVAL_SECONDS = float(os.getenv("JIRA_HISTORY_INTERVAL_SECONDS", "3600"))
+history = None  # WorkloadHistory when HISTORY_DIR is set
+
+def _record_history():
+    account_ids = [u.get('accountId') for u in membership.all_users()]
+    history.record(fetch_issue_pages(account_ids), account_ids, min_interval=HISTORY_INTERVAL_SECONDS / 2)
+
+# ==== BACKGROUND SERVICES ====
+_services_lock = threading.Lock()
+_threads = {}  # thread name -> running background thread
+
+def _run_every(seconds, wait, step, description):
+    """Thread body: once wait() returns, call step() every seconds, logging failures.
+
+    Each step passes min_interval=seconds / 2 to its file or directory, so
+    workers sharing it take turns and the others skip the round.
+    """
+    wait()
+    while True:
+        try:
+            step()
+        except Exception:
+            logger.exception("%s failed", description)
+        time.sleep(seconds)
+
+def _start_every(name, seconds, wait, step, description):
+    # Call with _services_lock held
+    if name not in _threads:
+        _threads[name] = threading.Thread(target=_run_every, args=(seconds, wait, step, description), name=name, daemon=True)
+        _threads[name].start()
+
+def build_services():
+    """Create this process's Jira session, caches and stores (idempotent); starts no threads."""
+    global session, membership, planner, issue_store, snapshots, history, _cube_cache, _overview_cache
+    with _services_lock:
+        if session is not None:
+            return
+        session = connect_to_jira()
+        # Membership loads in the background (see start_services) so the app serves immediately
+        membership = MembershipCache(session, GROUP_NAMES, user_filter=keep_user)
+        planner = IssuePlanner(lambda account_ids: stream_assignee_issue_pages(session, account_ids))
+        _cube_cache = TTLCache(maxsize=CUBE_CACHE_MAX_ENTRIES, ttl=SEARCH_CACHE_TTL, name="workload_cube", shared=True)
+        _overview_cache = TTLCache(maxsize=32, ttl=SEARCH_CACHE_TTL, name="overview", shared=True)
+        if ISSUE_STORE_PATH:
+            issue_store = IssueStore(ISSUE_STORE_PATH)
+        if SNAPSHOT_DIR:
+            snapshots = SnapshotDir(SNAPSHOT_DIR)
+        if HISTORY_DIR:
+            history = WorkloadHistory(HISTORY_DIR)
+
+def start_services():
+    """Start this process's membership refresher, issue store sync, snapshot writer and history sampler (idempotent).
+
+    With JIRA_SNAPSHOT_DIR set, membership and per-assignee issues are seeded
+    from the latest snapshot first, so the first page view after a restart
+    needs no Jira calls; the planner stops serving the snapshot once it is
+    older than the cache TTL.
+
+    Threads do not survive fork, so call this in each worker (gunicorn without
+    --preload does, via create_server) rather than at import time.
+    """
+    build_services()
+    with _services_lock:
+        if snapshots is not None and not membership.is_ready():
+            snapshot = snapshots.current()
+            if snapshot is not None:
+                membership.seed(snapshot.groups)
+                planner.seed(snapshot)
+        membership.start()
+        if issue_store is not None:
+            _start_every("issue-store-sync", STORE_SYNC_SECONDS, membership.wait_ready, _sync_store, "Issue store sync")
+        # Seeded membership is what the old snapshot had; these wait for the live list
+        if snapshots is not None:
+            _start_every("snapshot-refresh", SNAPSHOT_REFRESH_SECONDS, membership.wait_refreshed, _refresh_snapshot, "Snapshot refresh")
+        if history is not None:
+            _start_every("workload-history", HISTORY_INTERVAL_SECONDS, membership.wait_refreshed, _record_history, "Workload history sample")
+
+# Open issues cached per person: members shared by several groups are fetched once
+planner = None  # IssuePlanner
+
+def fetch_issue_pages(account_ids):
+    """Yield pages of open IssueRecords for account_ids from the local store if ready, else from Jira.
+
+    Jira is reached through the per-assignee planner, which a warm start
+    seeds from the latest snapshot.
+    """
+    if issue_store is not None and issue_store.is_ready():
+        yield from issue_store.issues_for_assignees(account_ids).values()
+        return
+    yield from planner.iter_pages(account_ids)
+
+# ==== WORKLOAD CUBE ====
+# Full open-issue sets per user/group, indexed by due date and rolled up by
+# (project, account, due-week), so date and grouping changes never hit Jira
+CUBE_CACHE_MAX_ENTRIES = int(os.getenv("JIRA_CUBE_CACHE_MAX_ENTRIES", "64"))
+_cube_cache = None  # TTLCache of WorkloadCubes keyed by sorted account IDs
+
+def _build_cube(account_ids):
+    records = [record for page in fetch_issue_pages(account_ids) for record in page]
+    with aggregation_phase():
+        return WorkloadCube(DueDateIndex(records))
+
+def get_workload_cube(account_ids):
+    """Return the cached WorkloadCube over all open issues for account_ids."""
+    key = tuple(sorted(set(a for a in account_ids if a)))
+    # A cube built from the warm-start snapshot expires with it
+    return _cube_cache.get_or_load(key, lambda: _build_cube(key), ttl=lambda: planner.ttl_for(key))
+
+def invalidate_workload_cache():
+    """Drop cached cubes so the next view rebuilds from the planner or store."""
+    _cube_cache.invalidate()
+
+# ==== ORG OVERVIEW ====
+# Count-only queries per group and project, cached per due-date window
+_overview_cache = None  # TTLCache keyed by (start_date, end_date)
+
+def _load_overview(start_date, end_date):
+    members = {name: [u.get('accountId') for u in membership.group_members(name)] for name in GROUP_NAMES}
+    projects = get_projects(session)
+    groups, by_project = count_overview(session, members, projects, start_date, end_date)
+    return {"members": members, "projects": projects, "groups": groups, "by_project": by_project}
+
+def get_overview(start_date=None, end_date=None):
+    """Cached org-wide counts for a due-date window."""
+    return _overview_cache.get_or_load((start_date, end_date), lambda: _load_overview(start_date, end_date))
+
+# ==== BACKGROUND CALLBACKS ====
+# Cold group loads can take seconds; with a diskcache directory configured they
+# run in a child process so the worker stays free. The child hands its result
+# back through the shared cache, so this needs JIRA_SHARED_CACHE as well.
+BACKGROUND_CACHE_DIR = os.getenv("DASH_BACKGROUND_CACHE_DIR", "")
+BACKGROUND_CALLBACKS = bool(BACKGROUND_CACHE_DIR and SHARED_CACHE_PATH)
+if BACKGROUND_CACHE_DIR and not SHARED_CACHE_PATH:
+    logger.warning("DASH_BACKGROUND_CACHE_DIR is set but JIRA_SHARED_CACHE is not; running group loads in-process")
+
+def _background_manager():
+    if not BACKGROUND_CALLBACKS:
+        return None
+    import diskcache
+    return DiskcacheManager(diskcache.Cache(BACKGROUND_CACHE_DIR))
+
+def trend_tab():
+    return dcc.Tab(label='Workload Trends', value='tab-trend', children=[
+        html.Div([
+            html.H2("Workload Trends"),
+            dcc.Dropdown(
+                id='trend-series',
+                options=[],
+                multi=True,
+                placeholder='Select users or projects' if history is not None else 'Set JIRA_HISTORY_DIR to record history'
+            ),
+            dcc.DatePickerRange(
+                id='trend-date-range',
+                minimum_nights=0,
+                clearable=True
+            ),
+            dcc.Graph(id='trend-issues'),
+            dcc.Graph(id='trend-hours'),
         ])
     ])
-])
 
-@app.callback(
+def serve_layout():
+    return html.Div([
+        dcc.Tabs(id='tabs', value='tab-user', children=[
+            dcc.Tab(label='Employee Workload Dashboard', value='tab-user', children=[
+                html.Div([
+                    html.H2("Employee Workload Dashboard"),
+                    dcc.Dropdown(
+                        id='user-dropdown',
+                        options=[],
+                        placeholder='Loading users...'
+                    ),
+                    # Polls quickly until membership has loaded, then at the refresh interval
+                    dcc.Interval(id='membership-poll', interval=1000),
+                    dcc.DatePickerRange(
+                        id='user-date-range',
+                        minimum_nights=0,
+                        clearable=True
+                    ),
+                    dash_table.DataTable(
+                        id='workload-table',
+                        columns=[
+                            {"name": "Project", "id": "Project", "presentation": "markdown"},
+                            {"name": "Issues", "id": "Issues", "presentation": "markdown"},
+                            # Issues count every assignee; workload only group members' issues
+                            {"name": "Group members' workload (hours)", "id": "Workload (hours)"},
+                            {"name": "Group members' workload (weeks, days, hours)", "id": "Workload (weeks, days, hours)"},
+                        ],
+                        data=[],
+                        style_as_list_view=True,
+                        style_table={"width": "100%"},
+                        style_header={"fontWeight": "bold", "textAlign": "center"},
+                        style_cell={"textAlign": "center", "padding": "8px"},
+                        style_data={"textAlign": "center"},
+                        style_data_conditional=[
+                            {
+                                "if": {"filter_query": '{Project} = "Total"'},
+                                "fontWeight": "bold",
+                            }
+                        ],
+                    )
+                ])
+            ]),
+            dcc.Tab(label='Group Workload Dashboard', value='tab-group', children=[
+                html.Div([
+                    html.H2("Group Workload Dashboard"),
+                    dcc.Dropdown(
+                        id='group-dropdown',
+                        options=[{'label': g, 'value': g} for g in GROUP_NAMES],
+                        placeholder='Select a group'
+                    ),
+                    # Set to the group name once its members and issues are cached
+                    dcc.Store(id='group-ready'),
+                    # Per-(project, employee) totals for the group and window; pivoted client-side
+                    dcc.Store(id='group-payload'),
+                    dcc.Dropdown(
+                        id='grouping-mode',
+                        options=[
+                            {'label': 'Project', 'value': 'project'},
+                            {'label': 'Employee', 'value': 'employee'},
+                            {'label': 'Project and Employee', 'value': 'project_employee'},
+                        ],
+                        value='project'
+                    ),
+                    dcc.DatePickerRange(
+                        id='date-range',
+                        minimum_nights=0,
+                        clearable=True
+                    ),
+                    dash_table.DataTable(
+                        id='group-workload-table',
+                        columns=[
+                            {"name": "Project", "id": "Project", "presentation": "markdown"},
+                            {"name": "Employee", "id": "Employee"},
+                            {"name": "Issues", "id": "Issues", "presentation": "markdown"},
+                            # Issues count every assignee; workload only group members' issues
+                            {"name": "Group members' workload (hours)", "id": "Workload (hours)"},
+                            {"name": "Group members' workload (weeks, days, hours)", "id": "Workload (weeks, days, hours)"},
+                        ],
+                        data=[],
+                        style_as_list_view=True,
+                        style_table={"width": "100%"},
+                        style_header={"fontWeight": "bold", "textAlign": "center"},
+                        style_cell={"textAlign": "center", "padding": "8px"},
+                        style_data={"textAlign": "center"},
+                        style_data_conditional=[
+                            {
+                                "if": {"filter_query": '{Project} = "Total"'},
+                                "fontWeight": "bold",
+                            }
+                        ],
+                    )
+                ])
+            ]),
+            dcc.Tab(label='Org Overview', value='tab-overview', children=[
+                html.Div([
+                    html.H2("Org Overview"),
+                    dcc.DatePickerRange(
+                        id='overview-date-range',
+                        minimum_nights=0,
+                        clearable=True
+                    ),
+                    html.H3("Groups"),
+                    dash_table.DataTable(
+                        id='overview-group-table',
+                        columns=[{"name": c, "id": c} for c in ["Group", "Members", "Issues", "Workload (hours)", "Workload (weeks, days, hours)"]],
+                        data=[],
+                        style_as_list_view=True,
+                        style_table={"width": "100%"},
+                        style_header={"fontWeight": "bold", "textAlign": "center"},
+                        style_cell={"textAlign": "center", "padding": "8px"},
+                        style_data={"textAlign": "center"},
+                    ),
+                    html.H3("Projects"),
+                    dash_table.DataTable(
+                        id='overview-project-table',
+                        columns=[
+                            {"name": "Project", "id": "Project", "presentation": "markdown"},
+                            {"name": "Issues", "id": "Issues"},
+                            # Issues count every assignee; workload only group members' issues
+                            {"name": "Group members' workload (hours)", "id": "Workload (hours)"},
+                            {"name": "Group members' workload (weeks, days, hours)", "id": "Workload (weeks, days, hours)"},
+                        ],
+                        data=[],
+                        style_as_list_view=True,
+                        style_table={"width": "100%"},
+                        style_header={"fontWeight": "bold", "textAlign": "center"},
+                        style_cell={"textAlign": "center", "padding": "8px"},
+                        style_data={"textAlign": "center"},
+                        style_data_conditional=[
+                            {
+                                "if": {"filter_query": '{Project} = "Total"'},
+                                "fontWeight": "bold",
+                            }
+                        ],
+                    )
+                ])
+            ]),
+            trend_tab(),
+        ])
+    ])
+
+@callback(
+    [
+        Output('user-dropdown', 'options'),
+        Output('user-dropdown', 'placeholder'),
+        Output('membership-poll', 'interval'),
+    ],
+    Input('membership-poll', 'n_intervals'),
+)
+@instrument_callback("update_user_options")
+def update_user_options(_):
+    if not membership.is_ready():
+        return no_update, no_update, no_update
+    options = [{'label': normalize_name(u.get('displayName', '')), 'value': u['accountId']} for u in membership.all_users()]
+    return options, 'Select a user', int(membership.refresh_seconds * 1000)
+
+@callback(
     Output('workload-table', 'data'),
     [
         Input('user-dropdown', 'value'),
@@ -159,236 +405,219 @@ app.layout = html.Div([
         Input('user-date-range', 'end_date'),
     ]
 )
+@instrument_callback("update_table")
 def update_table(account_id, start_date, end_date):
     if not account_id:
         return []
-    issues = get_user_issues_raw(session, account_id, start_due=start_date, end_due=end_date)
-    rows = []
-    for it in issues:
-        f = it.get('fields', {})
-        proj = (f.get('project') or {}).get('name')
-        proj_key = (f.get('project') or {}).get('key')
-        secs = f.get('timeoriginalestimate') or 0
-        rows.append([proj, proj_key, it.get('key'), secs])
-    if not rows:
-        df = pd.DataFrame([["No work assigned in the backlog", "", None, 0]], columns=["Project", "Project Key", "Issue", "Time (seconds)"])
-    else:
-        df = pd.DataFrame(rows, columns=["Project", "Project Key", "Issue", "Time (seconds)"])
-    grouped = df.groupby("Project").agg({
-        "Issue": "count",
-        "Time (seconds)": "sum",
-        "Project Key": "first",
-    }).reset_index().rename(columns={"Issue": "Issues"})
-    grouped["Workload (hours)"] = (grouped["Time (seconds)"] / 3600).round(2)
-    def fmt_weeks_days_hours(seconds: float) -> str:
-        total_hours = seconds / 3600
-        weeks = int(total_hours // 40)
-        rem_hours = total_hours - weeks * 40
-        days = int(rem_hours // 8)
-        hours = int(round(rem_hours - days * 8))
-        w = "week" if weeks == 1 else "weeks"
-        d = "day" if days == 1 else "days"
-        h = "hour" if hours == 1 else "hours"
-        return f"{weeks} {w}, {days} {d}, {hours} {h}"
-    grouped["Workload (weeks, days, hours)"] = grouped["Time (seconds)"].apply(fmt_weeks_days_hours)
-    total_issues = int(grouped["Issues"].sum())
-    total_seconds = float(grouped["Time (seconds)"].sum())
-    total_hours = round(total_seconds / 3600, 2)
-    total_formatted = fmt_weeks_days_hours(total_seconds)
-    def make_project_link(row):
-        key = str(row.get("Project Key", "")).strip()
-        name = str(row.get("Project", "")).strip()
-        if JIRA_URL and key and name:
-            return f"[{name}]({JIRA_URL}/browse/{key})"
-        return name
-    def make_issues_link(row):
-        key = str(row.get("Project Key", "")).strip()
-        issues_count = row.get("Issues", 0)
-        if JIRA_URL and key and issues_count:
-            jql_parts = [f"project={key}", f"assignee in (\"{account_id}\")", "statusCategory != Done"]
-            if start_date:
-                jql_parts.append(f"duedate >= \"{start_date}\"")
-            if end_date:
-                jql_parts.append(f"duedate <= \"{end_date}\"")
-            jql = " AND ".join(jql_parts)
-            return f"[{int(issues_count)}]({JIRA_URL}/issues/?jql={quote_plus(jql)})"
-        return str(int(issues_count)) if issues_count else "0"
-    if "Project Key" in grouped.columns:
-        grouped["Project"] = grouped.apply(make_project_link, axis=1)
-        grouped["Issues"] = grouped.apply(make_issues_link, axis=1)
-    keep_cols = ["Project", "Issues", "Workload (hours)", "Workload (weeks, days, hours)"]
-    grouped = grouped[[c for c in keep_cols if c in grouped.columns]]
-    records = grouped.to_dict("records")
-    records.append({
-        "Project": "Total",
-        "Issues": str(total_issues),
-        "Workload (hours)": total_hours,
-        "Workload (weeks, days, hours)": total_formatted,
-    })
-    return records
-
-@app.callback(
-    Output('group-workload-table', 'data'),
+    cube = get_workload_cube([account_id])
+    with aggregation_phase():
+        grouped = cube.reduce("project", start_date, end_date)
+        grouped = grouped[grouped["Project"].notna()]
+        if grouped.empty:
+            grouped = pd.DataFrame([["No work assigned in the backlog", 0, 0, ""]], columns=["Project", "Issues", "Time (seconds)", "Project Key"])
+        return build_workload_records(
+            grouped, "project", [account_id], start_date, end_date, JIRA_URL,
+            columns=["Project", "Issues", "Workload (hours)", "Workload (weeks, days, hours)"],
+        )
+
+@callback(
+    Output('group-ready', 'data'),
+    Input('group-dropdown', 'value'),
+    background=BACKGROUND_CALLBACKS,
+)
+@instrument_callback("load_group")
+def load_group(group_name):
+    """Warm the membership and cube caches for a group; the table renders from them."""
+    if not group_name:
+        return None
+    group_users = membership.group_members(group_name)
+    get_workload_cube([u.get('accountId') for u in group_users])
+    return group_name
+
+@callback(
+    Output('group-payload', 'data'),
     [
-        Input('group-dropdown', 'value'),
-        Input('grouping-mode', 'value'),
+        Input('group-ready', 'data'),
         Input('date-range', 'start_date'),
         Input('date-range', 'end_date'),
     ]
 )
-def update_group_table(group_name, mode, start_date, end_date):
+@instrument_callback("update_group_payload")
+def update_group_payload(group_name, start_date, end_date):
     if not group_name:
-        return []
-    group_users = get_users_from_groups(session, [group_name])
-    if APPLY_DOMAIN_FILTER:
-        def keep(u):
-            email = str(u.get("emailAddress", "")).strip().lower()
-            return (not email) or email.endswith(EMAIL_DOMAIN)
-        group_users = [u for u in group_users if keep(u)]
-
-    rows = []
-    for u in group_users:
-        acc_id = u.get('accountId')
-        disp = normalize_name(u.get('displayName', ''))
-        issues = get_user_issues_raw(session, acc_id, start_due=start_date, end_due=end_date)
-        for it in issues:
-            f = it.get('fields', {})
-            proj = (f.get('project') or {}).get('name')
-            proj_key = (f.get('project') or {}).get('key')
-            secs = f.get('timeoriginalestimate') or 0
-            rows.append({
-                'Project': proj,
-                'Project Key': proj_key,
-                'Issue': it.get('key'),
-                'Time (seconds)': secs,
-                'Employee': disp,
-                'AccountId': acc_id,
-            })
-
-    if not rows:
-        df = pd.DataFrame([{
-            'Project': 'No work assigned in the backlog',
-            'Employee': '',
-            'Issue': None,
-            'Time (seconds)': 0,
-        }])
+        return None
+    group_users = membership.group_members(group_name)
+
+    display_names = {u.get('accountId'): normalize_name(u.get('displayName', '')) for u in group_users}
+    cube = get_workload_cube(list(display_names))
+    with aggregation_phase():
+        return build_group_payload(
+            cube, display_names, [u.get('accountId') for u in group_users if u.get('accountId')],
+            start_date, end_date, JIRA_URL,
+        )
+
+# Grouping mode switches re-pivot the stored payload in the browser (assets/group_table.js)
+clientside_callback(
+    ClientsideFunction(namespace='workload', function_name='groupTable'),
+    Output('group-workload-table', 'data'),
+    [
+        Input('group-payload', 'data'),
+        Input('grouping-mode', 'value'),
+    ]
+)
+
+@callback(
+    [
+        Output('overview-group-table', 'data'),
+        Output('overview-project-table', 'data'),
+    ],
+    [
+        Input('tabs', 'value'),
+        Input('overview-date-range', 'start_date'),
+        Input('overview-date-range', 'end_date'),
+    ]
+)
+@instrument_callback("update_overview")
+def update_overview(tab, start_date, end_date):
+    # Only query Jira once the tab is opened
+    if tab != 'tab-overview':
+        return no_update, no_update
+    overview = get_overview(start_date, end_date)
+    snapshot = snapshots.current() if snapshots is not None else None
+    with aggregation_phase():
+        return (
+            group_records(overview["groups"], overview["members"], snapshot, start_date, end_date),
+            project_records(
+                overview["by_project"], overview["projects"], snapshot, start_date, end_date, JIRA_URL,
+                account_ids=[a for members in overview["members"].values() for a in members],
+            ),
+        )
+
+@callback(
+    Output('trend-series', 'options'),
+    Input('tabs', 'value'),
+)
+@instrument_callback("update_trend_options")
+def update_trend_options(tab):
+    if tab != 'tab-trend' or history is None:
+        return no_update
+    names = {u['accountId']: normalize_name(u.get('displayName', '')) for u in membership.all_users() if u.get('accountId')}
+    users = [{'label': names.get(acc, acc), 'value': f"user:{acc}"} for acc in history.series("user")]
+    projects = [{'label': f"Project {key}", 'value': f"project:{key}"} for key in history.series("project")]
+    return sorted(users, key=lambda o: o['label'].lower()) + sorted(projects, key=lambda o: o['label'])
+
+@callback(
+    [
+        Output('trend-issues', 'figure'),
+        Output('trend-hours', 'figure'),
+    ],
+    [
+        Input('trend-series', 'value'),
+        Input('trend-date-range', 'start_date'),
+        Input('trend-date-range', 'end_date'),
+    ]
+)
+@instrument_callback("update_trends")
+def update_trends(series, start_date, end_date):
+    if history is None:
+        return no_update, no_update
+    issues, hours = [], []
+    labels = {u['accountId']: normalize_name(u.get('displayName', '')) for u in membership.all_users() if u.get('accountId')}
+    for value in series or []:
+        kind, _, name = value.partition(":")
+        frame = history.read(kind, name, start_date, end_date)
+        label = labels.get(name, name) if kind == "user" else f"Project {name}"
+        x = frame["Time"].dt.strftime("%Y-%m-%d %H:%M").tolist()
+        issues.append({"x": x, "y": frame["Issues"].tolist(), "name": label, "type": "scatter", "mode": "lines"})
+        hours.append({"x": x, "y": (frame["Time (seconds)"] / 3600).round(2).tolist(), "name": label, "type": "scatter", "mode": "lines"})
+    return (
+        {"data": issues, "layout": {"title": {"text": "Open issues"}}},
+        {"data": hours, "layout": {"title": {"text": "Workload (hours)"}}},
+    )
+
+# ==== EXPORT ====
+def export_names():
+    """accountId -> display name for every user across all configured groups."""
+    return {u['accountId']: normalize_name(u.get('displayName', '')) for u in membership.all_users() if u.get('accountId')}
+
+def export(kind, fmt):
+    """Stream the org-wide workload as /export/<issues|summary>.<csv|parquet>."""
+    if not membership.is_ready():
+        return Response("Group membership is still loading, try again shortly\n", status=503, mimetype="text/plain")
+    try:
+        chunks, mimetype = stream_export(session, export_names(), kind, fmt, issue_store)
+    except ValueError as exc:
+        return Response(f"{exc}\n", status=404, mimetype="text/plain")
+    except RuntimeError as exc:
+        return Response(f"{exc}\n", status=501, mimetype="text/plain")
+    headers = {"Content-Disposition": f'attachment; filename="workload-{kind}.{FORMATS[fmt][1]}"'}
+    return Response(chunks, mimetype=mimetype, headers=headers)
+
+# ==== WEBHOOKS ====
+def apply_issue_change(change):
+    """Patch the local store, per-assignee issues and cubes for one changed issue, without Jira calls.
+
+    Only cubes covering one of the issue's old or new assignees are loaded,
+    and rebuilt from the rows they already hold; they keep their original
+    expiry, so they are still reloaded from Jira on schedule. Cached searches
+    naming those assignees are dropped instead.
+    """
+    if issue_store is not None:
+        issue_store.apply_issue(change.issue, deleted=change.deleted)
+    invalidate_assignee_searches(change.assignees)
+    planner.patch_issue(change.key, change.record, change.assignees)
+    def patch(accounts):
+        record = change.record if change.record is not None and change.record.assignee_id in accounts else None
+        def apply(cube):
+            if record is None and not cube.index.has_issue(change.key):
+                return cube
+            return cube.replace_issue(change.key, record)
+        return apply
+
+    for accounts in _cube_cache.keys():
+        if not change.assignees.isdisjoint(accounts):
+            _cube_cache.update(accounts, patch(accounts))
+
+def jira_webhook():
+    """POST /webhooks/jira: apply issue events in place; membership events trigger a refresh."""
+    body = request.get_data()
+    if not verify_signature(body, request.headers.get("X-Hub-Signature")):
+        return Response("Bad signature\n", status=401, mimetype="text/plain")
+    payload = request.get_json(silent=True) or {}
+    event = payload.get("webhookEvent", "")
+    if event in ISSUE_EVENTS:
+        apply_issue_change(parse_issue_event(payload))
+    elif event in MEMBERSHIP_EVENTS:
+        membership.request_refresh()
     else:
-        df = pd.DataFrame(rows)
-
-    if mode == 'employee':
-        grp_cols = ['Employee']
-        agg_dict = {
-            'Issue': 'count',
-            'Time (seconds)': 'sum',
-            'AccountId': 'first',
-        }
-    elif mode == 'project_employee':
-        grp_cols = ['Project', 'Employee']
-        agg_dict = {
-            'Issue': 'count',
-            'Time (seconds)': 'sum',
-            'Project Key': 'first',
-            'AccountId': 'first',
-        }
+        return Response(f"Ignored {event or 'unknown event'}\n", status=202, mimetype="text/plain")
+    return Response(f"Applied {event}\n", mimetype="text/plain")
+
+# ==== APP FACTORY ====
+def create_app(services=True):
+    """Build the Dash app and start this process's background services.
+
+    services=False skips them, for a process that never serves requests
+    (the Werkzeug reloader's watcher).
+    """
+    app = Dash(__name__, background_callback_manager=_background_manager())
+    app.layout = serve_layout
+    app.server.add_url_rule("/metrics", "metrics", metrics)
+    app.server.add_url_rule("/export/<kind>.<fmt>", "export", export)
+    if webhooks_enabled():
+        app.server.add_url_rule("/webhooks/jira", "jira_webhook", jira_webhook, methods=["POST"])
     else:
-        grp_cols = ['Project']
-        agg_dict = {
-            'Issue': 'count',
-            'Time (seconds)': 'sum',
-            'Project Key': 'first',
-        }
-
-    grouped = df.groupby(grp_cols, dropna=False).agg(agg_dict).reset_index().rename(columns={'Issue': 'Issues'})
-
-    def fmt_weeks_days_hours(seconds: float) -> str:
-        total_hours = seconds / 3600 if seconds else 0
-        weeks = int(total_hours // 40)
-        rem_hours = total_hours - weeks * 40
-        days = int(rem_hours // 8)
-        hours = int(round(rem_hours - days * 8))
-        w = "week" if weeks == 1 else "weeks"
-        d = "day" if days == 1 else "days"
-        h = "hour" if hours == 1 else "hours"
-        return f"{weeks} {w}, {days} {d}, {hours} {h}"
-
-    grouped['Workload (hours)'] = (grouped['Time (seconds)'] / 3600).round(2)
-    grouped['Workload (weeks, days, hours)'] = grouped['Time (seconds)'].apply(fmt_weeks_days_hours)
-
-    total_issues = int(grouped['Issues'].sum())
-    total_seconds = float(grouped['Time (seconds)'].sum())
-    total_hours = round(total_seconds / 3600, 2)
-    total_formatted = fmt_weeks_days_hours(total_seconds)
-
-    for col in ['Project', 'Employee']:
-        if col not in grouped.columns:
-            grouped[col] = ''
-
-    # Build clickable links for Project and Issues
-    def make_project_link(row):
-        key = str(row.get('Project Key', '')).strip()
-        name = str(row.get('Project', '')).strip()
-        if JIRA_URL and key and name:
-            return f"[{name}]({JIRA_URL}/browse/{key})"
-        return name
-
-    # Build JQL for issues link based on grouping mode
-    # Collect all group accountIds for 'project' mode
-    all_acc_ids = [u.get('accountId') for u in group_users if u.get('accountId')]
-
-    def make_issues_link(row):
-        issues_count = row.get('Issues', 0)
-        if not issues_count:
-            return '0'
-        parts = []
-        if mode in ('project', 'project_employee'):
-            key = str(row.get('Project Key', '')).strip()
-            if key:
-                parts.append(f"project={key}")
-        if mode == 'employee':
-            acc = row.get('AccountId') or ''
-            if acc:
-                parts.append(f"assignee in (\"{acc}\")")
-        elif mode == 'project_employee':
-            acc = row.get('AccountId') or ''
-            if acc:
-                parts.append(f"assignee in (\"{acc}\")")
-        else:  # project mode
-            if all_acc_ids:
-                acc_list = ",".join([f'"{a}"' for a in all_acc_ids])
-                parts.append(f"assignee in ({acc_list})")
-        parts.append("statusCategory != Done")
-        if start_date:
-            parts.append(f"duedate >= \"{start_date}\"")
-        if end_date:
-            parts.append(f"duedate <= \"{end_date}\"")
-        jql = " AND ".join(parts)
-        return f"[{int(issues_count)}]({JIRA_URL}/issues/?jql={quote_plus(jql)})"
-
-    if 'Project' in grouped.columns:
-        grouped['Project'] = grouped.apply(make_project_link, axis=1)
-    grouped['Issues'] = grouped.apply(make_issues_link, axis=1)
-
-    keep_cols = [
-        'Project',
-        'Employee',
-        'Issues',
-        'Workload (hours)',
-        'Workload (weeks, days, hours)'
-    ]
-    # Drop helper columns before rendering
-    drop_helpers = [c for c in ['Project Key', 'AccountId', 'Time (seconds)'] if c in grouped.columns]
-    grouped = grouped.drop(columns=drop_helpers, errors='ignore')
-    grouped = grouped[[c for c in keep_cols if c in grouped.columns]]
-
-    records = grouped.to_dict('records')
-    records.append({
-        'Project': 'Total',
-        'Employee': '',
-        'Issues': str(total_issues),
-        'Workload (hours)': total_hours,
-        'Workload (weeks, days, hours)': total_formatted,
-    })
-    return records
+        logger.info("JIRA_WEBHOOK_SECRET is not set; /webhooks/jira is disabled")
+    if services:
+        start_services()
+    return app
+
+def create_server():
+    """WSGI entry point for gunicorn and other servers."""
+    return create_app().server
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # The reloader re-runs this module in a child (WERKZEUG_RUN_MAIN=true) that
+    # serves requests; the watching parent must not poll Jira as well
+    create_app(services=os.environ.get("WERKZEUG_RUN_MAIN") == "true").run(debug=True)
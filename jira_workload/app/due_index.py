@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Project", "Project Key", "Issue", "Time (seconds)", "AccountId", "Due"]
+
+
+def _as_day(value):
+    # Date pickers send YYYY-MM-DD, occasionally with a time suffix
+    return np.datetime64(str(value)[:10], "D")
+
+
+def _records_frame(records):
+    frame = pd.DataFrame({
+        "Project": [r.project_name for r in records],
+        "Project Key": [r.project_key for r in records],
+        "Issue": [r.key for r in records],
+        "Time (seconds)": np.fromiter((r.estimate for r in records), dtype=np.int64, count=len(records)),
+        "AccountId": [r.assignee_id for r in records],
+        "Due": [r.duedate for r in records],
+    }, columns=COLUMNS)
+    frame["Due"] = pd.to_datetime(frame["Due"], errors="coerce").astype("datetime64[s]")
+    return frame
+
+
+class DueDateIndex:
+    """Open IssueRecords held in due-date order so date windows are answered by slicing.
+
+    Dated issues come first, sorted by due date, followed by undated ones.
+    A window with either bound set matches only dated issues, mirroring the
+    `duedate >=`/`duedate <=` JQL it replaces; an open window returns all.
+    """
+
+    def __init__(self, records):
+        self._set_frame(_records_frame(list(records)))
+
+    def _set_frame(self, frame):
+        frame = frame.sort_values("Due", kind="stable", na_position="last").reset_index(drop=True)
+        self.frame = frame
+        dues = frame["Due"].to_numpy()
+        self.n_dated = int((~np.isnat(dues)).sum())
+        self._dues = dues[:self.n_dated].astype("datetime64[D]")
+
+    def has_issue(self, key):
+        return bool((self.frame["Issue"] == key).any())
+
+    def replace_issue(self, key, record=None):
+        """A new index without issue key, plus record if given; this one is left unchanged."""
+        frame = self.frame[self.frame["Issue"] != key]
+        if record is not None:
+            frame = pd.concat([frame, _records_frame([record])], ignore_index=True)
+        index = DueDateIndex.__new__(DueDateIndex)
+        index._set_frame(frame)
+        return index
+
+    def __len__(self):
+        return len(self.frame)
+
+    def offsets(self, start_date=None, end_date=None):
+        """Return the [lo, hi) row range for a due-date window."""
+        if not start_date and not end_date:
+            return 0, len(self.frame)
+        lo = int(np.searchsorted(self._dues, _as_day(start_date), "left")) if start_date else 0
+        hi = int(np.searchsorted(self._dues, _as_day(end_date), "right")) if end_date else self.n_dated
+        return lo, max(lo, hi)
+
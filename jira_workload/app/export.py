@@ -0,0 +1,187 @@
+"""Org-wide workload export across every JIRA_GROUP_NAMES group, streamed as CSV or Parquet.
+
+Rows are written as Jira (or local store) pages arrive, so large exports
+start downloading immediately and run in bounded memory.
+
+    python -m jira_workload.app.export issues --format csv -o issues.csv
+    python -m jira_workload.app.export summary --format parquet -o summary.parquet
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+from contextlib import closing
+
+from jira_workload.api.jira_api import stream_assignee_issue_pages
+
+ISSUE_COLUMNS = ["Issue", "Project", "Project Key", "Employee", "AccountId", "Due", "Time (seconds)", "Workload (hours)"]
+SUMMARY_COLUMNS = ["Project", "Project Key", "Employee", "AccountId", "Issues", "Time (seconds)", "Workload (hours)"]
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+# ==== ROWS ====
+def iter_org_pages(session, account_ids, store=None):
+    """Pages of open IssueRecords for account_ids, from the local store if ready, else from Jira."""
+    if store is not None and store.is_ready():
+        return store.iter_assignee_pages(account_ids)
+    return stream_assignee_issue_pages(session, account_ids)
+
+
+def iter_issue_rows(pages, names):
+    """One batch of per-issue rows per page."""
+    for page in pages:
+        yield [
+            (r.key, r.project_name, r.project_key, names.get(r.assignee_id, ""), r.assignee_id,
+             r.duedate, r.estimate, round(r.estimate / 3600, 2))
+            for r in page
+        ]
+
+
+def iter_summary_rows(pages, names):
+    """Per-(project, employee) totals, as a single batch once every page is read.
+
+    Memory grows with the number of project/employee pairs, not issues.
+    """
+    totals = {}
+    for page in pages:
+        for r in page:
+            cell = totals.setdefault((r.project_name, r.project_key, r.assignee_id), [0, 0])
+            cell[0] += 1
+            cell[1] += r.estimate
+    rows = [
+        (project, key, names.get(acc, ""), acc, n, s, round(s / 3600, 2))
+        for (project, key, acc), (n, s) in totals.items()
+    ]
+    rows.sort(key=lambda row: (row[0] or "", row[2], row[3] or ""))
+    yield rows
+
+
+KINDS = {
+    "issues": (ISSUE_COLUMNS, iter_issue_rows),
+    "summary": (SUMMARY_COLUMNS, iter_summary_rows),
+}
+
+
+# ==== ENCODERS ====
+def iter_csv(batches, columns):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def take():
+        data = buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+        return data
+
+    # Header first, so the download starts before the first page arrives
+    writer.writerow(columns)
+    yield take()
+    for batch in batches:
+        writer.writerows(batch)
+        yield take()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose written bytes are collected and drained by the caller."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    return pyarrow, pyarrow.parquet
+
+
+def iter_parquet(batches, columns):
+    """One Parquet row group per batch; requires pyarrow."""
+    pa, pq = _pyarrow()
+    types = {"Time (seconds)": pa.int64(), "Issues": pa.int64(), "Workload (hours)": pa.float64()}
+    schema = pa.schema([(c, types.get(c, pa.string())) for c in columns])
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in batches:
+            if batch:
+                writer.write_table(pa.Table.from_pylist([dict(zip(columns, row)) for row in batch], schema=schema))
+                yield sink.drain()
+    yield sink.drain()
+
+
+def stream_export(session, names, kind, fmt, store=None):
+    """Return (chunk iterator, mimetype) exporting the open issues of every account in names.
+
+    names maps accountId to the display name used in the Employee column.
+    Raises ValueError for an unknown kind/format and RuntimeError if Parquet
+    is requested without pyarrow, before any row is produced.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet":
+        _pyarrow()
+
+    columns, rows = KINDS[kind]
+    batches = rows(iter_org_pages(session, list(names), store), names)
+    encode = iter_csv if fmt == "csv" else iter_parquet
+    return encode(batches, columns), FORMATS[fmt][0]
+
+
+# ==== CLI ====
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export open-issue workload for every configured group.")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    from jira_workload.app.users import load_org, normalize_name
+
+    session, membership, store = load_org()
+    names = {u['accountId']: normalize_name(u.get('displayName', '')) for u in membership.all_users() if u.get('accountId')}
+    chunks, _ = stream_export(session, names, args.kind, args.format, store)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        # Closing the chunks stops the concurrent Jira fetches behind them
+        with closing(chunks):
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+    except BrokenPipeError:
+        # Reader went away (e.g. `| head`); point stdout at devnull so the exit flush does not fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
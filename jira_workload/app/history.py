@@ -0,0 +1,233 @@
+"""Append-only workload history: open issues and estimate seconds per user and project over time.
+
+Samples are fixed-width NumPy records appended to one file per resolution
+and read back memory-mapped. Files are in time order, so a date range is
+two binary searches and a slice. `compact` downsamples old samples:
+raw points older than RAW_DAYS become one point per day, and daily points
+older than DAILY_DAYS become one point per week. Each downsampled point is
+the last sample of its day or week, i.e. the backlog as it stood at its end.
+
+    python -m jira_workload.app.history record
+"""
+import fcntl
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==== Env Variables ====
+RAW_DAYS = int(os.getenv("JIRA_HISTORY_RAW_DAYS", "30"))
+DAILY_DAYS = int(os.getenv("JIRA_HISTORY_DAILY_DAYS", "365"))
+
+USER, PROJECT = 0, 1
+KINDS = {"user": USER, "project": PROJECT}
+
+SAMPLE = np.dtype([("t", "<i8"), ("kind", "u1"), ("series", "<i4"), ("issues", "<i4"), ("seconds", "<i8")])
+
+# Coarsest first: a range read walks them in time order
+TIERS = ("weekly", "daily", "raw")
+
+
+def _bucket_start(t, width):
+    """Start (epoch seconds) of the day or week containing t."""
+    days = t // 86400
+    if width == 7 * 86400:
+        # Weeks start on Monday; 1970-01-01 was a Thursday
+        days = days - (days + 3) % 7
+    return days * 86400
+
+
+def downsample(samples, width):
+    """Keep the last sample per (series, bucket of width seconds), in time order."""
+    if not len(samples):
+        return samples
+    bucket = _bucket_start(samples["t"], width)
+    key = pd.DataFrame({"b": bucket, "k": samples["kind"], "s": samples["series"]})
+    last = ~key.duplicated(keep="last").to_numpy()
+    return samples[last]
+
+
+class WorkloadHistory:
+    """The history files in one directory; writers take an flock, readers need none."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._names = None
+        self._names_mtime = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    # ==== SERIES NAMES ====
+    def _load_names(self):
+        path = self._path("series.json")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        if mtime != self._names_mtime:
+            with open(path, encoding="utf-8") as fh:
+                self._names = [tuple(n) for n in json.load(fh)]
+            self._names_mtime = mtime
+        return self._names
+
+    def _series_ids(self, keys):
+        """Ids for (kind, name) keys, registering new ones (call with the lock held)."""
+        names = list(self._load_names())
+        index = {n: i for i, n in enumerate(names)}
+        ids = []
+        for key in keys:
+            if key not in index:
+                index[key] = len(names)
+                names.append(key)
+            ids.append(index[key])
+        if len(names) != len(self._load_names()):
+            tmp = self._path(".series.json.tmp")
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(names, fh)
+            os.replace(tmp, self._path("series.json"))
+        return ids
+
+    def series(self, kind):
+        """Names recorded for kind ('user' or 'project')."""
+        return [name for k, name in self._load_names() if k == KINDS[kind]]
+
+    # ==== WRITE ====
+    def _tier(self, name):
+        path = self._path(f"{name}.bin")
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=SAMPLE)
+        return np.memmap(path, dtype=SAMPLE, mode="r")
+
+    def _last_time(self):
+        raw = self._tier("raw")
+        return int(raw["t"][-1]) if len(raw) else None
+
+    def append(self, at, user_totals, project_totals):
+        """Append one sample per user and project; totals map name to (issues, seconds).
+
+        Call with the lock held (see record).
+        """
+        keys = [(USER, n) for n in user_totals] + [(PROJECT, n) for n in project_totals]
+        values = list(user_totals.values()) + list(project_totals.values())
+        rows = np.empty(len(keys), dtype=SAMPLE)
+        rows["t"] = int(at)
+        rows["kind"] = [k for k, _ in keys]
+        rows["series"] = self._series_ids(keys)
+        rows["issues"] = [v[0] for v in values]
+        rows["seconds"] = [v[1] for v in values]
+        with open(self._path("raw.bin"), "ab") as fh:
+            fh.write(rows.tobytes())
+
+    def _rewrite(self, name, samples):
+        tmp = self._path(f".{name}.bin.tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(np.ascontiguousarray(samples).tobytes())
+        os.replace(tmp, self._path(f"{name}.bin"))
+
+    def compact(self, now=None):
+        """Move raw samples past RAW_DAYS into daily, and daily past DAILY_DAYS into weekly.
+
+        Only the finer tier is rewritten; the coarser one is appended to.
+        Call with the lock held (see record).
+        """
+        now = int(now if now is not None else time.time())
+        for finer, coarser, width, days in (("raw", "daily", 86400, RAW_DAYS), ("daily", "weekly", 7 * 86400, DAILY_DAYS)):
+            samples = self._tier(finer)
+            # Cut on a bucket boundary so no day or week is split across tiers
+            cutoff = _bucket_start(now - days * 86400, width)
+            split = int(np.searchsorted(samples["t"], cutoff, "left")) if len(samples) else 0
+            if not split:
+                continue
+            moved = downsample(np.array(samples[:split]), width)
+            keep = np.array(samples[split:])
+            with open(self._path(f"{coarser}.bin"), "ab") as fh:
+                fh.write(moved.tobytes())
+            del samples
+            self._rewrite(finer, keep)
+
+    def record(self, pages, account_ids=(), min_interval=0, now=None):
+        """Aggregate IssueRecord pages into one sample per user and project, then compact.
+
+        Every account in account_ids and every project recorded before gets a
+        sample, (0, 0) if it has no open issues now, so charts drop to zero
+        instead of bridging the gap. Returns False without recording if
+        another process holds the lock or the last sample is less than
+        min_interval seconds old.
+        """
+        with open(self._path(".lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            now = int(now if now is not None else time.time())
+            last = self._last_time()
+            if last is not None and now - last < min_interval:
+                return False
+            users = {a: [0, 0] for a in account_ids if a}
+            projects = {name: [0, 0] for name in self.series("project")}
+            for page in pages:
+                for r in page:
+                    for totals, name in ((users, r.assignee_id), (projects, r.project_key)):
+                        if name:
+                            cell = totals.setdefault(name, [0, 0])
+                            cell[0] += 1
+                            cell[1] += r.estimate
+            self.append(now, users, projects)
+            self.compact(now)
+            return True
+
+    # ==== READ ====
+    def read(self, kind, name, start=None, end=None):
+        """DataFrame of Time, Issues and Time (seconds) for one series between two dates.
+
+        Reads only the samples inside [start, end] from each tier.
+        """
+        try:
+            series_id = self._load_names().index((KINDS[kind], name))
+        except ValueError:
+            return pd.DataFrame(columns=["Time", "Issues", "Time (seconds)"])
+        lo = int(pd.Timestamp(start).timestamp()) if start else None
+        hi = int((pd.Timestamp(end) + pd.Timedelta(days=1)).timestamp()) if end else None
+        parts = []
+        for tier in TIERS:
+            samples = self._tier(tier)
+            a = int(np.searchsorted(samples["t"], lo, "left")) if lo is not None and len(samples) else 0
+            b = int(np.searchsorted(samples["t"], hi, "left")) if hi is not None and len(samples) else len(samples)
+            window = samples[a:b]
+            parts.append(np.array(window[window["series"] == series_id]))
+        rows = np.concatenate(parts)
+        return pd.DataFrame({
+            "Time": pd.to_datetime(rows["t"], unit="s"),
+            "Issues": rows["issues"],
+            "Time (seconds)": rows["seconds"],
+        })
+
+
+# ==== CLI ====
+def main(argv=None):
+    """Record one sample for every JIRA_GROUP_NAMES member (for cron instead of the dashboard thread)."""
+    args = argv if argv is not None else sys.argv[1:]
+    if args != ["record"]:
+        print("usage: python -m jira_workload.app.history record", file=sys.stderr)
+        return 2
+
+    from jira_workload.app.export import iter_org_pages
+    from jira_workload.app.users import load_org
+
+    history_dir = os.getenv("JIRA_HISTORY_DIR", "")
+    if not history_dir:
+        print("JIRA_HISTORY_DIR is not set", file=sys.stderr)
+        return 2
+    session, membership, store = load_org()
+    account_ids = [u["accountId"] for u in membership.all_users() if u.get("accountId")]
+    WorkloadHistory(history_dir).record(iter_org_pages(session, account_ids, store), account_ids)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import logging
+import os
+import threading
+
+from jira_workload.api.cache import TTLCache
+from jira_workload.api.concurrency import run_concurrently
+from jira_workload.api.jira_api import filter_human_users, get_group_members, merge_users
+
+# ==== Env Variables ====
+MEMBERSHIP_REFRESH_SECONDS = float(os.getenv("JIRA_MEMBERSHIP_REFRESH_SECONDS", "900"))
+
+logger = logging.getLogger(__name__)
+
+
+class MembershipCache:
+    """Group membership loaded in the background and refreshed on an interval.
+
+    Nothing is fetched at construction. `start()` launches a daemon thread
+    that pages through every group and repeats every `refresh_seconds`.
+    `group_members` serves from the cache, loading a single group on demand
+    if the background load has not reached it yet.
+    """
+
+    def __init__(self, session, group_names, user_filter=None, refresh_seconds=MEMBERSHIP_REFRESH_SECONDS):
+        self.session = session
+        self.group_names = list(group_names)
+        self.user_filter = user_filter or (lambda u: True)
+        self.refresh_seconds = refresh_seconds
+        # Entries outlive one refresh cycle so a failed refresh keeps serving the last data
+        self._groups = TTLCache(maxsize=max(len(self.group_names), 1) * 2, ttl=refresh_seconds * 3, name="membership", shared=True)
+        self._users = []
+        self._ready = threading.Event()
+        self._refreshed = threading.Event()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _load_group(self, group_name):
+        members = filter_human_users(get_group_members(self.session, group_name))
+        return merge_users([[u for u in members if self.user_filter(u)]])
+
+    def refresh(self):
+        """Re-fetch every group concurrently and rebuild the combined user list."""
+        loaded = run_concurrently(self._load_group, self.group_names)
+        for name, members in zip(self.group_names, loaded):
+            self._groups.set(name, members)
+        self._users = merge_users(loaded)
+        self._ready.set()
+        self._refreshed.set()
+
+    def seed(self, groups):
+        """Serve previously saved {group: members} until the first refresh replaces it."""
+        for name, members in groups.items():
+            if name in self.group_names:
+                self._groups.set(name, members)
+        self._users = merge_users(members for name, members in groups.items() if name in self.group_names)
+        self._ready.set()
+
+    def groups(self):
+        """{group: members} for every group currently cached."""
+        loaded = {name: self._groups.get(name) for name in self.group_names}
+        return {name: members for name, members in loaded.items() if members is not None}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Group membership refresh failed")
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+
+    def start(self):
+        """Start the background refresher (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="membership-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def request_refresh(self):
+        """Refresh now rather than at the next interval (e.g. on a membership webhook)."""
+        self._wake.set()
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def wait_refreshed(self, timeout=None):
+        """Wait for a live refresh from Jira, as opposed to seeded data."""
+        return self._refreshed.wait(timeout)
+
+    def all_users(self):
+        """Deduped users across all groups; empty until the first refresh completes."""
+        return self._users
+
+    def group_members(self, group_name):
+        """Filtered, sorted members of one group, loading it now if not cached yet."""
+        return self._groups.get_or_load(group_name, lambda: self._load_group(group_name))
@@ -0,0 +1,94 @@
+"""Org overview: open issue counts per group and per project from count-only queries.
+
+Every count is one approximate-count call fired in parallel, so the whole
+organisation costs a few dozen lightweight requests instead of pulling
+every issue. Estimates cannot be counted that way; they come from the
+warm-start snapshot and are left blank unless it holds every account they
+would sum over. Project counts include every assignee, while project
+estimates cover group members only; the table headers say so.
+"""
+import pandas as pd
+
+from jira_workload.api.concurrency import run_concurrently
+from jira_workload.api.jira_api import assignee_chunk_jqls, build_open_issues_jql, count_issues
+from jira_workload.app.aggregation import format_weeks_days_hours, project_links
+
+GROUP_COLUMNS = ["Group", "Members", "Issues", "Workload (hours)", "Workload (weeks, days, hours)"]
+PROJECT_COLUMNS = ["Project", "Issues", "Workload (hours)", "Workload (weeks, days, hours)"]
+
+
+def count_overview(session, members_by_group, projects, start_due=None, end_due=None):
+    """Open issue counts per group and per project key in a due-date window.
+
+    members_by_group maps group name to member account IDs; a group larger
+    than one JQL clause allows is counted in chunks and summed.
+    Returns ({group: count}, {project key: count}).
+    """
+    jobs = [
+        ("group", name, jql)
+        for name, account_ids in members_by_group.items()
+        for jql in assignee_chunk_jqls(account_ids, start_due, end_due, min_chunks=1)
+    ]
+    jobs += [("project", p["key"], build_open_issues_jql(f'project = "{p["key"]}"', start_due, end_due)) for p in projects]
+    counts = run_concurrently(lambda job: count_issues(session, job[2]), jobs)
+
+    groups = dict.fromkeys(members_by_group, 0)
+    by_project = {}
+    for (kind, name, _), n in zip(jobs, counts):
+        if kind == "group":
+            groups[name] += n
+        else:
+            by_project[name] = n
+    return groups, by_project
+
+
+def _workload_columns(out, seconds):
+    out["Workload (hours)"] = (seconds / 3600).round(2).astype(object).where(seconds.notna(), "")
+    text = format_weeks_days_hours(seconds)
+    out["Workload (weeks, days, hours)"] = text.where(seconds.notna(), "")
+    return out
+
+
+def group_records(group_counts, members_by_group, snapshot=None, start_due=None, end_due=None):
+    """One DataTable row per group, largest backlog first.
+
+    A group's workload is blank unless the snapshot holds all its members.
+    Groups overlap, so there is no Total row.
+    """
+    names = list(group_counts)
+    out = pd.DataFrame({
+        "Group": names,
+        "Members": [len(members_by_group.get(n, [])) for n in names],
+        "Issues": [group_counts[n] for n in names],
+    })
+    seconds = pd.Series(
+        [snapshot.estimate_seconds(members_by_group.get(n, []), start_due, end_due) if snapshot is not None else None for n in names],
+        dtype=float,
+    )
+    out = _workload_columns(out, seconds)
+    return out.sort_values(["Issues", "Group"], ascending=[False, True], kind="stable")[GROUP_COLUMNS].to_dict("records")
+
+
+def project_records(project_counts, projects, snapshot=None, start_due=None, end_due=None, jira_url="", account_ids=()):
+    """One DataTable row per project with open issues, largest first, plus a Total row.
+
+    Issues count every assignee; workload sums the issues of account_ids
+    (every group member) and is blank unless the snapshot holds them all.
+    """
+    if snapshot is not None and not snapshot.covers(account_ids):
+        snapshot = None
+    rows = [p for p in projects if project_counts.get(p["key"])]
+    names = pd.Series([p["name"] for p in rows], dtype=object)
+    keys = pd.Series([p["key"] for p in rows], dtype=object)
+    out = pd.DataFrame({
+        "Project": project_links(names, keys, jira_url),
+        "Issues": [project_counts[p["key"]] for p in rows],
+    })
+    estimates = snapshot.project_estimate_seconds(start_due, end_due) if snapshot is not None else None
+    seconds = pd.Series([estimates.get(k, 0) if estimates is not None else None for k in keys], dtype=float)
+    out = _workload_columns(out, seconds)
+    out = out.sort_values("Issues", ascending=False, kind="stable")
+
+    total = _workload_columns(pd.DataFrame({"Project": ["Total"], "Issues": [int(out["Issues"].sum())]}),
+                              pd.Series([seconds.sum() if estimates is not None else None], dtype=float))
+    return pd.concat([out, total], ignore_index=True)[PROJECT_COLUMNS].to_dict("records")
@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+
+from jira_workload.api.cache import TTLCache
+from jira_workload.api.jira_api import SEARCH_CACHE_TTL
+from jira_workload.metrics import CACHE_LOOKUPS
+
+# ==== Env Variables ====
+# One entry per tracked account; size it above the number of unique group members
+ASSIGNEE_CACHE_MAX_ENTRIES = int(os.getenv("JIRA_ASSIGNEE_CACHE_MAX_ENTRIES", "5000"))
+
+_MISSING = object()
+
+
+class IssuePlanner:
+    """Open issues cached per assignee, so overlapping groups share one fetch per person.
+
+    A request for several accounts (one group, or the union of many) looks
+    each account up, fetches only the missing ones in a single batched
+    search and fans the records back out per account. Accounts another
+    thread is already fetching are waited on rather than fetched again, so
+    Jira traffic scales with unique users, not group memberships.
+
+    A warm-start snapshot passed to `seed` answers for its accounts until
+    they are first loaded live, straight from its memory-mapped columns.
+    """
+
+    def __init__(self, fetch_pages, ttl=SEARCH_CACHE_TTL, maxsize=ASSIGNEE_CACHE_MAX_ENTRIES):
+        # fetch_pages(account_ids) yields pages of IssueRecords straight from Jira
+        self._fetch_pages = fetch_pages
+        self._ttl = ttl
+        self._issues = TTLCache(maxsize=maxsize, ttl=ttl, name="assignee_issues", shared=True)
+        self._lock = threading.Lock()
+        self._flights = {}  # accountId -> Event set when its fetch finishes
+        self._seed = None  # Snapshot serving accounts not loaded live yet
+        self._seed_until = 0.0
+        self._seeded = set()  # accounts still served from the seed
+
+    def _seed_for(self, acc):
+        """The seed snapshot if it still serves acc, else None (call with the lock held)."""
+        if self._seed is not None and time.time() >= self._seed_until:
+            self._seed, self._seeded = None, set()
+        return self._seed if acc in self._seeded else None
+
+    def _plan(self, account_ids):
+        """Split account_ids into (cached or seeded {acc: records}, accounts to fetch, fetches to wait on)."""
+        cached, fetch, wait, seeded = {}, [], [], []
+        with self._lock:
+            for acc in account_ids:
+                records = self._issues.get(acc, _MISSING)
+                if records is not _MISSING:
+                    cached[acc] = records
+                elif self._seed_for(acc) is not None:
+                    seed = self._seed
+                    seeded.append(acc)
+                elif acc in self._flights:
+                    wait.append(acc)
+                else:
+                    self._flights[acc] = threading.Event()
+                    fetch.append(acc)
+        CACHE_LOOKUPS.inc(len(cached), cache="assignee_issues", result="hit")
+        CACHE_LOOKUPS.inc(len(seeded), cache="assignee_issues", result="snapshot")
+        CACHE_LOOKUPS.inc(len(fetch), cache="assignee_issues", result="miss")
+        CACHE_LOOKUPS.inc(len(wait), cache="assignee_issues", result="coalesced")
+        if seeded:
+            cached.update((acc, tuple(records)) for acc, records in seed.issues_by_account(seeded).items())
+        return cached, fetch, wait
+
+    def _fetch(self, account_ids):
+        by_assignee = {acc: [] for acc in account_ids}
+        try:
+            for page in self._fetch_pages(account_ids):
+                for record in page:
+                    if record.assignee_id in by_assignee:
+                        by_assignee[record.assignee_id].append(record)
+            for acc, records in by_assignee.items():
+                self._issues.set(acc, tuple(records))
+        finally:
+            with self._lock:
+                for acc in account_ids:
+                    self._flights.pop(acc).set()
+                self._seeded.difference_update(account_ids)
+        return {acc: tuple(records) for acc, records in by_assignee.items()}
+
+    def issues_for(self, account_ids):
+        """{accountId: tuple of open IssueRecords} for every distinct account in account_ids."""
+        account_ids = list(dict.fromkeys(a for a in account_ids if a))
+        cached, fetch, wait = self._plan(account_ids)
+        result = dict(cached)
+        if fetch:
+            result.update(self._fetch(fetch))
+        for acc in wait:
+            with self._lock:
+                flight = self._flights.get(acc)
+            if flight is not None:
+                flight.wait()
+        # A failed or invalidated fetch by another thread leaves gaps; fill them ourselves
+        late = [acc for acc in wait if self._issues.get(acc, _MISSING) is _MISSING]
+        result.update({acc: self._issues.get(acc) for acc in wait if acc not in late})
+        if late:
+            result.update(self.issues_for(late))
+        return {acc: result[acc] for acc in account_ids}
+
+    def iter_pages(self, account_ids):
+        """Yield one page of IssueRecords per account that has open issues."""
+        for records in self.issues_for(account_ids).values():
+            if records:
+                yield list(records)
+
+    def cached(self, account_ids):
+        """{accountId: records} for the accounts in account_ids already cached; never fetches."""
+        cached = {}
+        for acc in dict.fromkeys(a for a in account_ids if a):
+            records = self._issues.get(acc, _MISSING)
+            if records is not _MISSING:
+                cached[acc] = records
+        return cached
+
+    def seed(self, snapshot):
+        """Serve snapshot's accounts from it until each is loaded live.
+
+        The snapshot counts as loaded when it was written, so it stops being
+        served once it is older than the cache TTL.
+        """
+        with self._lock:
+            self._seed = snapshot
+            self._seed_until = snapshot.created + self._ttl
+            self._seeded = set(snapshot.accounts)
+
+    def ttl_for(self, account_ids):
+        """Seconds a result built from account_ids' issues stays current: less while any is served from the seed."""
+        with self._lock:
+            if any(self._seed_for(a) is not None for a in account_ids):
+                return max(self._seed_until - time.time(), 0)
+        return self._ttl
+
+    def patch_issue(self, issue_key, record, account_ids):
+        """Drop issue_key from the cached accounts in account_ids and add record to its assignee's.
+
+        Patched entries keep their original expiry, so they are still reloaded
+        from Jira on schedule.
+        """
+        def patch(acc):
+            def apply(records):
+                patched = tuple(r for r in records if r.key != issue_key)
+                if record is not None and record.assignee_id == acc:
+                    patched += (record,)
+                return patched if patched != records else records
+            return apply
+
+        for acc in set(a for a in account_ids if a):
+            if self._issues.update(acc, patch(acc)):
+                continue
+            with self._lock:
+                # Re-check under the lock: another patch may have moved acc out of the seed
+                if self._issues.update(acc, patch(acc)):
+                    continue
+                seed = self._seed_for(acc)
+                if seed is None:
+                    continue
+                # Move a seeded account into the cache so the patch sticks; it expires with the seed
+                records = tuple(seed.issues_by_account([acc]).get(acc, ()))
+                self._issues.set(acc, patch(acc)(records), ttl=self._seed_until - time.time())
+                self._seeded.discard(acc)
+
+    def invalidate(self):
+        with self._lock:
+            self._seed, self._seeded = None, set()
+        self._issues.invalidate()
@@ -0,0 +1,68 @@
+"""Which Jira users the dashboard shows and how their names are displayed.
+
+Shared by the Dash app and the headless tools, so neither needs the other.
+"""
+import os
+
+from dotenv import load_dotenv, find_dotenv
+load_dotenv(find_dotenv())
+
+from jira_workload.api.jira_api import connect_to_jira
+from jira_workload.api.store import IssueStore
+from jira_workload.app.membership import MembershipCache
+
+# Get users from specific Jira groups (comma-separated in .env as JIRA_GROUP_NAMES)
+GROUP_NAMES = [g.strip() for g in os.getenv("JIRA_GROUP_NAMES", "").split(",") if g.strip()]
+APPLY_DOMAIN_FILTER = os.getenv("APPLY_DOMAIN_FILTER", "true").lower() == "true"
+EMAIL_DOMAIN = os.getenv("JIRA_EMAIL_DOMAIN", "@apscorp.ca").lower()
+JIRA_URL = os.getenv("JIRA_URL", "").rstrip("/")
+ISSUE_STORE_PATH = os.getenv("JIRA_ISSUE_STORE", "")
+
+def keep_user(u):
+    if not APPLY_DOMAIN_FILTER:
+        return True
+    email = str(u.get("emailAddress", "")).strip().lower()
+    return (not email) or email.endswith(EMAIL_DOMAIN)
+
+
+def load_org():
+    """(session, MembershipCache, IssueStore or None) for a headless tool.
+
+    Membership is refreshed before returning; the store is the
+    JIRA_ISSUE_STORE file when one is configured.
+    """
+    session = connect_to_jira()
+    membership = MembershipCache(session, GROUP_NAMES, user_filter=keep_user)
+    membership.refresh()
+    store = IssueStore(ISSUE_STORE_PATH) if ISSUE_STORE_PATH else None
+    return session, membership, store
+
+
+def normalize_name(name: str) -> str:
+    # Title-case words; preserve hyphens; uppercase dotted initials (e.g., J.s. -> J.S.)
+    if not isinstance(name, str):
+        return ""
+
+    def title_or_initials(token: str) -> str:
+        # If token contains dots, uppercase each dotted segment like initials
+        if "." in token:
+            segs = token.split(".")
+            new = []
+            for s in segs:
+                if s == "":
+                    new.append("")
+                elif len(s) == 1:
+                    new.append(s.upper())
+                else:
+                    new.append(s.capitalize())
+            return ".".join(new)
+        # Otherwise normal title-case
+        return token.capitalize()
+
+    words = []
+    for w in name.split(" "):
+        hy = []
+        for h in w.split("-"):
+            hy.append(title_or_initials(h))
+        words.append("-".join(hy))
+    return " ".join(words)
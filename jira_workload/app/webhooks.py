@@ -0,0 +1,100 @@
+"""Jira webhook payloads turned into in-place cache updates.
+
+Register http(s)://<dashboard>/webhooks/jira in Jira (Settings > System >
+WebHooks) for issue created/updated/deleted and user/group events. Recorded
+payloads can be replayed against a local server:
+
+    python -m jira_workload.app.webhooks payload.json [more.json ...] --url http://localhost:8050/webhooks/jira
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+
+import requests
+
+from jira_workload.api.records import IssueRecord
+
+# ==== Env Variables ====
+# Shared secret configured on the Jira webhook; without it the endpoint is off
+WEBHOOK_SECRET = os.getenv("JIRA_WEBHOOK_SECRET", "")
+# Accept unsigned payloads instead (only behind a proxy that restricts who can post)
+ALLOW_UNSIGNED = os.getenv("JIRA_WEBHOOK_ALLOW_UNSIGNED", "false").strip().lower() == "true"
+
+ISSUE_EVENTS = {"jira:issue_created", "jira:issue_updated", "jira:issue_deleted"}
+MEMBERSHIP_EVENTS = {"user_created", "user_updated", "user_deleted", "group_created", "group_updated", "group_deleted"}
+
+
+def webhooks_enabled(secret=WEBHOOK_SECRET, allow_unsigned=ALLOW_UNSIGNED):
+    """True if payloads can be checked (a secret is set) or unsigned ones were explicitly allowed."""
+    return bool(secret) or allow_unsigned
+
+
+def verify_signature(body, signature, secret=WEBHOOK_SECRET, allow_unsigned=ALLOW_UNSIGNED):
+    """Check an X-Hub-Signature header ("sha256=<hex>") against the raw request body."""
+    if not secret:
+        return allow_unsigned
+    method, _, digest = (signature or "").partition("=")
+    if method != "sha256" or not digest:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+class IssueChange:
+    """One issue event: the issue key, its record if it is still open, and every assignee it touched."""
+    __slots__ = ("key", "record", "assignees", "issue", "deleted")
+
+    def __init__(self, key, record, assignees, issue, deleted):
+        self.key = key
+        self.record = record
+        self.assignees = assignees
+        self.issue = issue
+        self.deleted = deleted
+
+
+def _is_open(issue):
+    status = (issue.get("fields") or {}).get("status") or {}
+    return (status.get("statusCategory") or {}).get("key") != "done"
+
+
+def parse_issue_event(payload):
+    """IssueChange for a jira:issue_* payload.
+
+    Previous assignees come from the changelog, so a reassigned issue is
+    removed from its old owner's cached views as well.
+    """
+    issue = payload.get("issue") or {}
+    deleted = payload.get("webhookEvent") == "jira:issue_deleted"
+    record = IssueRecord.from_json(issue)
+    assignees = {record.assignee_id}
+    for item in (payload.get("changelog") or {}).get("items", []):
+        if (item.get("fieldId") or item.get("field")) == "assignee":
+            assignees.update((item.get("from"), item.get("to")))
+    assignees.discard(None)
+    keep = record if not deleted and _is_open(issue) and record.assignee_id else None
+    return IssueChange(record.key, keep, assignees, issue, deleted)
+
+
+# ==== CLI ====
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Post recorded Jira webhook payloads to a dashboard.")
+    parser.add_argument("payloads", nargs="+", help="JSON files, each holding one webhook payload")
+    parser.add_argument("--url", default="http://localhost:8050/webhooks/jira")
+    args = parser.parse_args(argv)
+
+    for path in args.payloads:
+        with open(path, "rb") as fh:
+            body = fh.read()
+        headers = {"Content-Type": "application/json"}
+        if WEBHOOK_SECRET:
+            headers["X-Hub-Signature"] = "sha256=" + hmac.new(WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+        response = requests.post(args.url, data=body, headers=headers, timeout=30)
+        event = json.loads(body).get("webhookEvent")
+        print(f"{path}: {event} -> {response.status_code} {response.text.strip()}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Lightweight in-process metrics with Prometheus text exposition.
+
+Counters and histograms are plain locked dicts keyed by label values, so
+recording is cheap and there is no extra dependency. Per-callback figures
+(Jira requests, HTTP time, aggregation time) are accumulated on a
+CallbackStats object carried in a ContextVar; the thread-pool helpers in
+jira_workload.api.concurrency copy the caller's context into their workers
+so fanned-out requests are attributed to the callback that caused them.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', bound)])} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', '+Inf')])} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {state[-1]}")
+        return lines
+
+
+def render_metrics():
+    """Return every registered metric in Prometheus text format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ==== METRICS ====
+JIRA_REQUESTS = Counter("jira_http_requests_total", "Jira HTTP requests sent", ["endpoint", "status"])
+JIRA_REQUEST_SECONDS = Histogram("jira_http_request_seconds", "Jira HTTP request latency", ["endpoint"])
+JIRA_RESPONSE_BYTES = Counter("jira_http_response_bytes_total", "Decoded Jira response body bytes", ["endpoint"])
+JIRA_SEARCH_PAGES = Counter("jira_search_pages_total", "Result pages fetched from /search/jql")
+JIRA_RETRIES = Counter("jira_http_retries_total", "Requests retried after a throttled or unavailable response", ["status"])
+JIRA_THROTTLE_SECONDS = Counter("jira_throttle_wait_seconds_total", "Time spent waiting out Retry-After windows")
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by outcome (hit, miss, coalesced)", ["cache", "result"])
+CALLBACK_SECONDS = Histogram("dash_callback_seconds", "Dash callback latency", ["callback"])
+CALLBACK_JIRA_REQUESTS = Histogram(
+    "dash_callback_jira_requests", "Jira requests issued per callback", ["callback"],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250),
+)
+CALLBACK_PHASE_SECONDS = Counter(
+    "dash_callback_phase_seconds_total",
+    "Time inside callbacks by phase; http is summed across concurrent requests", ["callback", "phase"],
+)
+CALLBACK_ERRORS = Counter("dash_callback_errors_total", "Callbacks that raised", ["callback"])
+
+
+# ==== PER-CALLBACK ACCOUNTING ====
+class CallbackStats:
+    __slots__ = ("jira_requests", "http_seconds", "aggregation_seconds", "_lock")
+
+    def __init__(self):
+        self.jira_requests = 0
+        self.http_seconds = 0.0
+        self.aggregation_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_request(self, seconds):
+        with self._lock:
+            self.jira_requests += 1
+            self.http_seconds += seconds
+
+
+current_callback = ContextVar("current_callback", default=None)
+
+
+def record_http(endpoint, status, seconds, nbytes):
+    JIRA_REQUESTS.inc(endpoint=endpoint, status=status)
+    JIRA_REQUEST_SECONDS.observe(seconds, endpoint=endpoint)
+    JIRA_RESPONSE_BYTES.inc(nbytes, endpoint=endpoint)
+    stats = current_callback.get()
+    if stats is not None:
+        stats.add_request(seconds)
+
+
+@contextmanager
+def aggregation_phase():
+    """Time a block of pandas/numpy work and attribute it to the current callback."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = current_callback.get()
+        if stats is not None:
+            stats.aggregation_seconds += time.perf_counter() - start
+
+
+def instrument_callback(name):
+    """Decorator recording latency, Jira requests and phase times for a Dash callback."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats = CallbackStats()
+            token = current_callback.set(stats)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                CALLBACK_ERRORS.inc(callback=name)
+                raise
+            finally:
+                current_callback.reset(token)
+                CALLBACK_SECONDS.observe(time.perf_counter() - start, callback=name)
+                CALLBACK_JIRA_REQUESTS.observe(stats.jira_requests, callback=name)
+                CALLBACK_PHASE_SECONDS.inc(stats.http_seconds, callback=name, phase="http")
+                CALLBACK_PHASE_SECONDS.inc(stats.aggregation_seconds, callback=name, phase="aggregation")
+        return wrapper
+    return decorator
@@ -0,0 +1,100 @@
+"""Headless Group Workload report for every JIRA_GROUP_NAMES group and grouping mode.
+
+Issues for the union of all group members are fetched once with concurrent
+Jira searches (or read from JIRA_ISSUE_STORE when it has synced), then each
+group's tables are aggregated in a separate process. No Dash app is built.
+
+    python -m jira_workload.report -o reports --start 2025-01-01 --end 2025-03-31
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from jira_workload.app.aggregation import build_group_table
+from jira_workload.app.cube import WorkloadCube
+from jira_workload.app.due_index import DueDateIndex
+from jira_workload.app.export import iter_org_pages
+from jira_workload.app.users import JIRA_URL, load_org, normalize_name
+
+MODES = ("project", "employee", "project_employee")
+
+
+def group_tables(job):
+    """(group, {mode: records}) for one group; runs in a worker process."""
+    group_name, records, display_names, assignee_ids, start_date, end_date, jira_url = job
+    cube = WorkloadCube(DueDateIndex(records))
+    return group_name, {
+        mode: build_group_table(cube, mode, display_names, assignee_ids, start_date, end_date, jira_url)
+        for mode in MODES
+    }
+
+
+def build_jobs(members_by_group, pages, start_date=None, end_date=None, jira_url=""):
+    """One aggregation job per group, each carrying only its members' IssueRecords."""
+    by_assignee = {}
+    for page in pages:
+        for record in page:
+            by_assignee.setdefault(record.assignee_id, []).append(record)
+    jobs = []
+    for name, users in members_by_group.items():
+        display_names = {u.get('accountId'): normalize_name(u.get('displayName', '')) for u in users}
+        assignee_ids = [u.get('accountId') for u in users if u.get('accountId')]
+        records = [r for acc in dict.fromkeys(assignee_ids) for r in by_assignee.get(acc, [])]
+        jobs.append((name, records, display_names, assignee_ids, start_date, end_date, jira_url))
+    return jobs
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-") or "group"
+
+
+def write_tables(output_dir, group_name, tables, fmt):
+    """Write one file per mode; returns their paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for mode, records in tables.items():
+        path = os.path.join(output_dir, f"{_slug(group_name)}-{mode}.{fmt}")
+        frame = pd.DataFrame(records)
+        if fmt == "csv":
+            frame.to_csv(path, index=False)
+        else:
+            frame.to_json(path, orient="records", indent=2)
+        paths.append(path)
+    return paths
+
+
+# ==== CLI ====
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write Group Workload tables for every configured group.")
+    parser.add_argument("-o", "--output-dir", default="reports")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--start", help="earliest due date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="latest due date (YYYY-MM-DD)")
+    parser.add_argument("--links", action="store_true", help="keep the dashboard's markdown links to Jira")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="aggregation processes")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    session, membership, store = load_org()
+    members_by_group = membership.groups()
+    account_ids = [u['accountId'] for u in membership.all_users() if u.get('accountId')]
+    jobs = build_jobs(
+        members_by_group, iter_org_pages(session, account_ids, store),
+        args.start, args.end, JIRA_URL if args.links else "",
+    )
+
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers or 1, len(jobs) or 1))) as pool:
+        for group_name, tables in pool.map(group_tables, jobs):
+            for path in write_tables(args.output_dir, group_name, tables, args.format):
+                print(path)
+    print(f"{len(jobs)} groups in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+
+# connection.py refuses to import without these; tests point JIRA_URL at a local fake
+os.environ.setdefault("JIRA_URL", "http://127.0.0.1:9")
+os.environ.setdefault("JIRA_USER_EMAIL", "tests@example.com")
+os.environ.setdefault("JIRA_API_TOKEN", "test-token")
+os.environ.pop("JIRA_SHARED_CACHE", None)
@@ -0,0 +1,209 @@
+import threading
+import time
+
+import pytest
+
+from jira_workload.api.cache import MemoryBackend, SQLiteBackend, TTLCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(maxsize=16, ttl=60.0, name="t"):
+        if request.param == "memory":
+            backend = MemoryBackend(maxsize)
+        else:
+            backend = SQLiteBackend(str(tmp_path / "cache.db"), name, maxsize)
+        return TTLCache(maxsize=maxsize, ttl=ttl, name=name, backend=backend)
+    return make
+
+
+def test_get_or_load_is_single_flight(make_cache):
+    cache = make_cache()
+    calls = []
+    start = threading.Barrier(8)
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": 42}
+
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(cache.get_or_load("k", loader))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 8
+    assert cache.get("k") == {"value": 42}
+
+
+def test_loader_error_reaches_every_waiter_and_is_not_cached(make_cache):
+    cache = make_cache()
+    start = threading.Barrier(4)
+    errors = []
+
+    def loader():
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    def worker():
+        start.wait()
+        try:
+            cache.get_or_load("k", loader)
+        except ValueError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 4
+    assert cache.get("k") is None
+    assert cache.get_or_load("k", lambda: 1) == 1
+
+
+def test_entries_expire_after_ttl(make_cache):
+    cache = make_cache(ttl=0.2)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+    assert cache.get("a") == 1
+    time.sleep(0.3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.keys() == ["b"]
+
+
+def test_callable_ttl_is_asked_after_loading(make_cache):
+    cache = make_cache(ttl=60)
+    order = []
+    cache.get_or_load("k", lambda: order.append("load") or "v", ttl=lambda: order.append("ttl") or 0.2)
+    assert order == ["load", "ttl"]
+    time.sleep(0.3)
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted(make_cache):
+    cache = make_cache(maxsize=3)
+    for key in "abc":
+        cache.set(key, key)
+        time.sleep(0.01)
+    assert cache.get("a") == "a"
+    time.sleep(0.01)
+    cache.set("d", "d")
+    assert sorted(cache.keys()) == ["a", "c", "d"]
+
+
+def test_update_keeps_expiry(make_cache):
+    cache = make_cache(ttl=0.4)
+    cache.set("k", [1])
+    time.sleep(0.2)
+    assert cache.update("k", lambda v: v + [2])
+    assert cache.get("k") == [1, 2]
+    time.sleep(0.3)
+    assert cache.get("k") is None
+
+
+def test_update_of_missing_entry_does_not_call_fn(make_cache):
+    cache = make_cache()
+    called = []
+    assert not cache.update("missing", lambda v: called.append(v) or v)
+    assert called == []
+
+
+def test_update_returning_its_argument_leaves_entry(make_cache):
+    cache = make_cache()
+    cache.set("k", {"n": 1})
+    assert cache.update("k", lambda v: v)
+    assert cache.get("k") == {"n": 1}
+
+
+def test_concurrent_updates_are_all_applied(make_cache):
+    cache = make_cache()
+    cache.set("k", ())
+
+    def worker(i):
+        for j in range(10):
+            cache.update("k", lambda v: v + ((i, j),))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(cache.get("k")) == [(i, j) for i in range(8) for j in range(10)]
+
+
+def test_invalidate_where_and_tuple_keys(make_cache):
+    cache = make_cache()
+    cache.set(("search", "alice"), 1)
+    cache.set(("search", "bob"), 2)
+    cache.set(("count", "alice"), 3)
+    cache.invalidate_where(lambda key: "alice" in key)
+    assert cache.keys() == [("search", "bob")]
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_invalidate_during_load_skips_storing(make_cache):
+    cache = make_cache()
+    loading = threading.Event()
+
+    def loader():
+        loading.set()
+        time.sleep(0.2)
+        return "stale"
+
+    t = threading.Thread(target=cache.get_or_load, args=("k", loader))
+    t.start()
+    loading.wait()
+    cache.invalidate("k")
+    t.join()
+    assert cache.get("k") is None
+
+
+def test_sqlite_lease_is_exclusive_until_released_or_expired(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"), "t", 16)
+    other = SQLiteBackend(str(tmp_path / "cache.db"), "t", 16)
+    assert backend.try_lease("k", 60)
+    assert not other.try_lease("k", 60)
+    backend.release_lease("k")
+    assert other.try_lease("k", 0.1)
+    time.sleep(0.2)
+    assert backend.try_lease("k", 60)
+
+
+def test_sqlite_namespaces_are_separate(tmp_path):
+    path = str(tmp_path / "cache.db")
+    a = TTLCache(name="a", backend=SQLiteBackend(path, "a", 16))
+    b = TTLCache(name="b", backend=SQLiteBackend(path, "b", 16))
+    a.set("k", 1)
+    assert b.get("k") is None
+    b.invalidate()
+    assert a.get("k") == 1
+
+
+def test_sqlite_caches_share_one_load(tmp_path):
+    # Two caches on one file stand in for two worker processes
+    path = str(tmp_path / "cache.db")
+    first = TTLCache(name="t", backend=SQLiteBackend(path, "t", 16))
+    second = TTLCache(name="t", backend=SQLiteBackend(path, "t", 16))
+    loading = threading.Event()
+
+    def slow_loader():
+        loading.set()
+        time.sleep(0.3)
+        return "from first"
+
+    t = threading.Thread(target=first.get_or_load, args=("k", slow_loader))
+    t.start()
+    loading.wait()
+    value = second.get_or_load("k", lambda: pytest.fail("second cache should wait for the lease"))
+    t.join()
+    assert value == "from first"
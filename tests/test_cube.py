@@ -0,0 +1,120 @@
+import datetime as dt
+import random
+
+import pytest
+
+from jira_workload.api.records import IssueRecord
+from jira_workload.app.cube import WorkloadCube
+from jira_workload.app.due_index import DueDateIndex
+
+BASE = dt.date(2025, 1, 1)
+ACCOUNTS = [f"acc-{i}" for i in range(7)]
+NAMES = {acc: f"User {i}" for i, acc in enumerate(ACCOUNTS)}
+PROJECTS = [(f"P{i}", f"Project {i}") for i in range(5)]
+
+
+def make_records(n, rng, start=0):
+    records = []
+    for i in range(start, start + n):
+        key, name = rng.choice(PROJECTS)
+        due = None if rng.random() < 0.2 else (BASE + dt.timedelta(days=rng.randint(0, 120))).isoformat()
+        records.append(IssueRecord(f"{key}-{i}", key, name, rng.choice(ACCOUNTS), rng.choice([0, 1800, 3600, 28800]), due))
+    return records
+
+
+def random_window(rng):
+    def day():
+        return (BASE + dt.timedelta(days=rng.randint(-10, 130))).isoformat()
+    shape = rng.random()
+    if shape < 0.1:
+        return None, None
+    if shape < 0.25:
+        return day(), None
+    if shape < 0.4:
+        return None, day()
+    start, end = sorted([day(), day()])
+    if rng.random() < 0.3:
+        end = (dt.date.fromisoformat(start) + dt.timedelta(days=rng.randint(0, 9))).isoformat()
+    return start, end
+
+
+def brute_force(records, mode, start, end):
+    """{group: (issues, seconds)} by filtering every record."""
+    totals = {}
+    for r in records:
+        if start or end:
+            if not r.duedate or (start and r.duedate < start) or (end and r.duedate > end):
+                continue
+        if mode == "employee":
+            group = NAMES[r.assignee_id]
+        elif mode == "project_employee":
+            group = (r.project_name, NAMES[r.assignee_id])
+        else:
+            group = r.project_name
+        issues, seconds = totals.get(group, (0, 0))
+        totals[group] = (issues + 1, seconds + r.estimate)
+    return totals
+
+
+def from_cube(cube, mode, start, end):
+    frame = cube.reduce(mode, start, end, display_names=NAMES)
+    if mode == "employee":
+        groups = frame["Employee"]
+    elif mode == "project_employee":
+        groups = zip(frame["Project"], frame["Employee"])
+    else:
+        groups = frame["Project"]
+    return {g: (int(n), int(s)) for g, n, s in zip(groups, frame["Issues"], frame["Time (seconds)"])}
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_windows_match_brute_force(seed):
+    rng = random.Random(seed)
+    records = make_records(400, rng)
+    cube = WorkloadCube(DueDateIndex(records))
+    for _ in range(100):
+        start, end = random_window(rng)
+        for mode in ("project", "employee", "project_employee"):
+            assert from_cube(cube, mode, start, end) == brute_force(records, mode, start, end), (mode, start, end)
+
+
+def test_every_week_alignment_matches_brute_force():
+    # Windows starting and ending on each weekday exercise both partial-week edges
+    rng = random.Random(11)
+    records = make_records(300, rng)
+    cube = WorkloadCube(DueDateIndex(records))
+    for offset in range(7):
+        for length in (0, 1, 5, 6, 7, 8, 13, 14, 15, 40):
+            start = BASE + dt.timedelta(days=20 + offset)
+            window = (start.isoformat(), (start + dt.timedelta(days=length)).isoformat())
+            assert from_cube(cube, "project", *window) == brute_force(records, "project", *window), window
+
+
+def test_totals_match_brute_force():
+    rng = random.Random(5)
+    records = make_records(300, rng)
+    cube = WorkloadCube(DueDateIndex(records))
+    for _ in range(50):
+        start, end = random_window(rng)
+        p, a, n, s = cube.totals(start, end)
+        got = {(cube.projects[pi], NAMES[cube.accounts[ai]]): (int(ni), int(si)) for pi, ai, ni, si in zip(p, a, n, s)}
+        assert got == brute_force(records, "project_employee", start, end)
+
+
+def test_replace_issue_matches_rebuilt_cube():
+    rng = random.Random(3)
+    records = make_records(200, rng)
+    cube = WorkloadCube(DueDateIndex(records))
+    changed = make_records(1, rng, start=10_000)[0]
+    changed.key = records[17].key
+    updated = cube.replace_issue(changed.key, changed)
+    removed = cube.replace_issue(records[42].key)
+
+    after_update = records[:17] + [changed] + records[18:]
+    after_remove = records[:42] + records[43:]
+    for _ in range(30):
+        start, end = random_window(rng)
+        assert from_cube(updated, "project_employee", start, end) == brute_force(after_update, "project_employee", start, end)
+        assert from_cube(removed, "employee", start, end) == brute_force(after_remove, "employee", start, end)
+    # The original cube is unchanged
+    assert from_cube(cube, "project", None, None) == brute_force(records, "project", None, None)
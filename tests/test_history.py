@@ -0,0 +1,103 @@
+import pandas as pd
+import pytest
+
+from jira_workload.api.records import IssueRecord
+from jira_workload.app import history
+from jira_workload.app.history import WorkloadHistory
+
+DAY = 86400
+# A Monday, so day and week buckets are easy to reason about
+T0 = int(pd.Timestamp("2025-01-06").timestamp())
+
+
+def record(account, project, estimate, key="X-1"):
+    return IssueRecord(key, project, project, account, estimate, None)
+
+
+def series_values(hist, kind, name):
+    frame = hist.read(kind, name)
+    return list(zip(frame["Time"].to_numpy().astype("datetime64[s]").astype("int64"), frame["Issues"], frame["Time (seconds)"]))
+
+
+@pytest.fixture
+def hist(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "RAW_DAYS", 2)
+    monkeypatch.setattr(history, "DAILY_DAYS", 14)
+    return WorkloadHistory(str(tmp_path))
+
+
+def test_record_sums_per_user_and_project(hist):
+    pages = [[record("alice", "A", 3600), record("alice", "B", 1800)], [record("bob", "A", 7200)]]
+    assert hist.record(pages, ["alice", "bob"], now=T0)
+    assert series_values(hist, "user", "alice") == [(T0, 2, 5400)]
+    assert series_values(hist, "user", "bob") == [(T0, 1, 7200)]
+    assert series_values(hist, "project", "A") == [(T0, 2, 10800)]
+    assert sorted(hist.series("user")) == ["alice", "bob"]
+    assert sorted(hist.series("project")) == ["A", "B"]
+
+
+def test_record_writes_zero_for_known_series_without_issues(hist):
+    hist.record([[record("alice", "A", 3600)]], ["alice"], now=T0)
+    hist.record([[]], ["alice"], now=T0 + 3600)
+    hist.record([[record("alice", "A", 60)]], ["alice"], now=T0 + 7200)
+    assert [v[1] for v in series_values(hist, "user", "alice")] == [1, 0, 1]
+    assert [v[2] for v in series_values(hist, "project", "A")] == [3600, 0, 60]
+
+
+def test_record_respects_min_interval(hist):
+    assert hist.record([[record("alice", "A", 1)]], ["alice"], now=T0)
+    assert not hist.record([[record("alice", "A", 1)]], ["alice"], min_interval=600, now=T0 + 60)
+    assert hist.record([[record("alice", "A", 1)]], ["alice"], min_interval=600, now=T0 + 600)
+    assert len(hist.read("user", "alice")) == 2
+
+
+def test_unknown_series_reads_empty(hist):
+    frame = hist.read("user", "nobody")
+    assert frame.empty
+    assert list(frame.columns) == ["Time", "Issues", "Time (seconds)"]
+
+
+def test_compact_keeps_last_sample_per_day_then_week(hist):
+    # Four samples a day for 30 days; alice's issue count is the sample number
+    n = 0
+    for day in range(30):
+        for hour in (0, 6, 12, 18):
+            n += 1
+            t = T0 + day * DAY + hour * 3600
+            hist.record([[record("alice", "A", 1, key=f"A-{i}") for i in range(n)]], ["alice"], now=t)
+    now = T0 + 29 * DAY + 18 * 3600
+
+    raw, daily, weekly = (hist._tier(name) for name in ("raw", "daily", "weekly"))
+    assert len(raw) and len(daily) and len(weekly)
+    raw_cut = history._bucket_start(now - 2 * DAY, DAY)
+    daily_cut = history._bucket_start(now - 14 * DAY, 7 * DAY)
+    assert raw["t"].min() >= raw_cut
+    assert daily["t"].min() >= daily_cut and daily["t"].max() < raw_cut
+    assert weekly["t"].max() < daily_cut
+
+    # Every downsampled point is the last sample of its bucket
+    values = {t: issues for t, issues, _ in series_values(hist, "user", "alice")}
+    for t in weekly["t"][weekly["series"] == 0]:
+        assert t == history._bucket_start(t, 7 * DAY) + 6 * DAY + 18 * 3600
+    for t in daily["t"][daily["series"] == 0]:
+        assert t == history._bucket_start(t, DAY) + 18 * 3600
+    assert values[now] == 120
+
+    # Reads walk the tiers in time order with no gaps in the raw range
+    frame = hist.read("user", "alice")
+    assert frame["Time"].is_monotonic_increasing
+    assert (frame["Issues"].diff().dropna() > 0).all()
+    assert len(frame) == len(weekly) // 2 + len(daily) // 2 + len(raw) // 2
+
+
+def test_read_limits_to_date_range_across_tiers(hist):
+    for day in range(30):
+        hist.record([[record("alice", "A", 1)]], ["alice"], now=T0 + day * DAY + 3600)
+    start, end = pd.Timestamp(T0 + 5 * DAY, unit="s"), pd.Timestamp(T0 + 27 * DAY, unit="s")
+    frame = hist.read("user", "alice", start.date().isoformat(), end.date().isoformat())
+    assert frame["Time"].min() >= start
+    # end is inclusive of its whole day
+    assert frame["Time"].max() < end + pd.Timedelta(days=1)
+    every = hist.read("user", "alice")
+    inside = every[(every["Time"] >= start) & (every["Time"] < end + pd.Timedelta(days=1))]
+    assert frame.reset_index(drop=True).equals(inside.reset_index(drop=True))
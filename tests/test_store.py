@@ -0,0 +1,116 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.fake_jira import SyntheticOrg, make_handler
+from jira_workload.api import jira_api
+from jira_workload.api.store import IssueStore
+
+
+@pytest.fixture
+def org():
+    return SyntheticOrg(users=6, groups=2, issues_per_user=30, projects=4)
+
+
+@pytest.fixture
+def session(org, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(org, max_page_size=7))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(jira_api, "JIRA_URL", f"http://127.0.0.1:{server.server_port}")
+    yield jira_api.connect_to_jira()
+    server.shutdown()
+    server.server_close()
+
+
+def stored(store, account_ids):
+    return {
+        acc: sorted((r.key, r.project_key, r.estimate, r.duedate) for r in records)
+        for acc, records in store.issues_for_assignees(account_ids).items()
+    }
+
+
+def expected(org, account_ids):
+    out = {}
+    for acc in account_ids:
+        out[acc] = sorted(
+            (i["key"], i["fields"]["project"]["key"], i["fields"]["timeoriginalestimate"] or 0, i["fields"]["duedate"])
+            for i in org.issues_by_assignee.get(acc, [])
+            if i["fields"]["status"]["statusCategory"]["key"] != "done"
+        )
+    return out
+
+
+def test_full_sync_loads_open_issues_of_tracked_users(org, session, tmp_path):
+    store = IssueStore(str(tmp_path / "issues.db"))
+    tracked = [u["accountId"] for u in org.users[:4]]
+    assert not store.is_ready()
+    assert store.sync(session, tracked)
+    assert store.is_ready()
+    assert stored(store, tracked) == expected(org, tracked)
+    assert stored(store, [org.users[5]["accountId"]]) == {org.users[5]["accountId"]: []}
+
+
+def test_delta_sync_applies_changes_since_last_sync(org, session, tmp_path):
+    store = IssueStore(str(tmp_path / "issues.db"))
+    alice, bob, carol, outsider = (u["accountId"] for u in org.users[:4])
+    tracked = [alice, bob, carol]
+    store.sync(session, tracked)
+
+    added = org.add_issue(alice, "BP1", estimate=900, duedate="2030-01-01")
+    closed = org.issues_by_assignee[bob][0]["key"]
+    org.update_issue(closed, done=True)
+    moved = org.issues_by_assignee[carol][0]["key"]
+    org.update_issue(moved, assignee=alice)
+    away = org.issues_by_assignee[carol][1]["key"]
+    org.update_issue(away, assignee=outsider)
+    edited = org.issues_by_assignee[bob][1]["key"]
+    org.update_issue(edited, timeoriginalestimate=12345)
+    # An edit Jira did not stamp as updated is invisible to a delta sync
+    untouched = org.issues_by_assignee[bob][2]
+    old_estimate = untouched["fields"]["timeoriginalestimate"]
+    org.update_issue(untouched["key"], touch=False, timeoriginalestimate=99999)
+
+    assert store.sync(session, tracked)
+    keys = {acc: {row[0] for row in rows} for acc, rows in stored(store, tracked).items()}
+    assert added in keys[alice] and moved in keys[alice]
+    assert closed not in keys[bob]
+    assert moved not in keys[carol] and away not in keys[carol]
+    assert store.issues_for_assignees([outsider]) == {outsider: []}
+    estimates = {r.key: r.estimate for r in store.issues_for_assignees([bob])[bob]}
+    assert estimates[edited] == 12345
+    assert estimates[untouched["key"]] == (old_estimate or 0)
+
+    untouched["fields"]["timeoriginalestimate"] = old_estimate
+    assert stored(store, tracked) == expected(org, tracked)
+
+
+def test_sync_follows_changes_to_tracked_users(org, session, tmp_path):
+    store = IssueStore(str(tmp_path / "issues.db"))
+    accounts = [u["accountId"] for u in org.users]
+    store.sync(session, accounts[:3])
+    store.sync(session, accounts[1:5])
+    assert stored(store, accounts) == {**expected(org, accounts[1:5]), accounts[0]: [], accounts[5]: []}
+
+
+def test_sync_skips_within_min_interval(org, session, tmp_path):
+    store = IssueStore(str(tmp_path / "issues.db"))
+    tracked = [org.users[0]["accountId"]]
+    assert store.sync(session, tracked)
+    assert not store.sync(session, tracked, min_interval=3600)
+
+
+def test_apply_issue_keeps_only_open_tracked_issues(org, session, tmp_path):
+    store = IssueStore(str(tmp_path / "issues.db"))
+    alice, outsider = org.users[0]["accountId"], org.users[5]["accountId"]
+    store.sync(session, [alice])
+    issue = org.issues_by_assignee[alice][0]
+    org.update_issue(issue["key"], assignee=outsider)
+    store.apply_issue(issue)
+    assert issue["key"] not in {r.key for r in store.issues_for_assignees([alice])[alice]}
+    org.update_issue(issue["key"], assignee=alice)
+    store.apply_issue(issue)
+    assert issue["key"] in {r.key for r in store.issues_for_assignees([alice])[alice]}
+    store.apply_issue(issue, deleted=True)
+    assert issue["key"] not in {r.key for r in store.issues_for_assignees([alice])[alice]}